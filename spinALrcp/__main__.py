@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 包内模块使用扁平导入（from runtime import ...），把包目录加入搜索路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main
+
+sys.exit(main())
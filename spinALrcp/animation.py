@@ -0,0 +1,191 @@
+from bisect import bisect_right
+from typing import Optional
+
+from skeleton_data import Animation, EventTimeline
+
+BEZIER_ITERATIONS = 20
+
+
+def _bezier_percent(curve, percent: float) -> float:
+    """求解 x(s) = percent 的贝塞尔参数 s，再返回 y(s)"""
+    cx1, cy1, cx2, cy2 = curve
+    low = 0.0
+    high = 1.0
+    s = percent
+    for _ in range(BEZIER_ITERATIONS):
+        inv = 1 - s
+        x = 3 * inv * inv * s * cx1 + 3 * inv * s * s * cx2 + s * s * s
+        if abs(x - percent) < 1e-7:
+            break
+        if x < percent:
+            low = s
+        else:
+            high = s
+        s = (low + high) * 0.5
+    inv = 1 - s
+    return 3 * inv * inv * s * cy1 + 3 * inv * s * s * cy2 + s * s * s
+
+
+def curve_percent(curve, percent: float) -> float:
+    """按前一关键帧的曲线把线性进度映射为插值进度"""
+    if curve is None:
+        return percent
+    if curve == "stepped":
+        return 0.0
+    return _bezier_percent(curve, percent)
+
+
+def find_frame(frames, time: float) -> int:
+    """返回 time 所在区间的前一关键帧下标（time 早于第一帧时返回 -1）"""
+    low = 0
+    high = len(frames)
+    while low < high:
+        mid = (low + high) // 2
+        if frames[mid]["time"] <= time:
+            low = mid + 1
+        else:
+            high = mid
+    return low - 1
+
+
+def sample_bone_timeline(frames, time: float, rotate: bool = False) -> Optional[tuple]:
+    """采样时间轴数值，早于第一帧返回 None（保持 setup pose）"""
+    index = find_frame(frames, time)
+    if index < 0:
+        return None
+    frame = frames[index]
+    if index == len(frames) - 1:
+        return frame["values"]
+
+    next_frame = frames[index + 1]
+    span = next_frame["time"] - frame["time"]
+    percent = (time - frame["time"]) / span if span > 0 else 0.0
+    percent = curve_percent(frame["curve"], percent)
+
+    values = frame["values"]
+    next_values = next_frame["values"]
+    if rotate:
+        # 角度走最短路径
+        delta = next_values[0] - values[0]
+        delta -= round(delta / 360) * 360
+        return (values[0] + delta * percent,)
+    return tuple(v + (n - v) * percent for v, n in zip(values, next_values))
+
+
+def set_bones_to_setup_pose(skeleton):
+    for bone in skeleton.all_bones:
+        data = bone.data
+        bone.x = data.x
+        bone.y = data.y
+        bone.rotation = data.rotation
+        bone.scaleX = data.scaleX
+        bone.scaleY = data.scaleY
+        bone.shearX = data.shearX
+        bone.shearY = data.shearY
+
+
+def _set_slot_attachments(skeleton, animation: Optional[Animation], time: float):
+    """setup 附件再用附件时间轴覆盖：每条时间轴一次 bisect 加一次数组读取"""
+    attachments = list(skeleton.setup_attachments)
+    if animation is not None:
+        skin = skeleton.skin
+        for timeline in animation.slot_timelines:
+            index = bisect_right(timeline.times, time) - 1
+            if index >= 0:
+                attachments[timeline.slot_index] = timeline.resolve(skin)[index]
+    for slot, attachment in zip(skeleton.slots_by_index, attachments):
+        # 附件不变时保留 attachment_time
+        if slot is not None and attachment is not slot.attachment:
+            slot.set_attachment(attachment)
+
+
+def set_slots_to_setup_pose(skeleton):
+    _set_slot_attachments(skeleton, None, 0)
+    skeleton.draw_order = skeleton.setup_draw_order
+    skeleton.reset_slot_colors()
+
+
+def draw_order_at(animation: Animation, time: float):
+    """time 时刻生效的绘制顺序数组，None 表示 setup 顺序"""
+    timeline = animation.draw_order_timeline
+    if timeline is None:
+        return None
+    index = bisect_right(timeline.times, time) - 1
+    return timeline.orders[index] if index >= 0 else None
+
+
+def apply_animation(skeleton, animation: Animation, time: float, loop: bool = True):
+    """把动画在 time 时刻的姿态写入骨骼本地变换与插槽附件（基于 setup pose），不更新世界变换"""
+    if loop and animation.duration > 0:
+        time %= animation.duration
+
+    set_bones_to_setup_pose(skeleton)
+    bones = {bone.data.name: bone for bone in skeleton.all_bones}
+    for timeline in animation.bone_timelines:
+        bone = bones.get(timeline.bone_name)
+        if bone is None:
+            continue
+        timeline_type = timeline.type
+        values = sample_bone_timeline(timeline.frames, time, timeline_type == "rotate")
+        if values is None:
+            continue
+        data = bone.data
+        if timeline_type == "rotate":
+            bone.rotation = data.rotation + values[0]
+        elif timeline_type == "translate":
+            bone.x = data.x + values[0]
+            bone.y = data.y + values[1]
+        elif timeline_type == "scale":
+            bone.scaleX = data.scaleX * values[0]
+            bone.scaleY = data.scaleY * values[1]
+        elif timeline_type == "shear":
+            bone.shearX = data.shearX + values[0]
+            bone.shearY = data.shearY + values[1]
+
+    _set_slot_attachments(skeleton, animation, time)
+    # 关键帧已预先展开为完整排列，这里只替换引用
+    skeleton.draw_order = draw_order_at(animation, time) or skeleton.setup_draw_order
+
+    # 所有插槽颜色一次数组采样
+    skeleton.reset_slot_colors()
+    if animation.color_timelines is not None:
+        animation.color_timelines.apply(time, skeleton.slot_colors, skeleton.slot_dark_colors)
+
+
+def fired_events(timeline: Optional[EventTimeline], last_time: Optional[float], time: float,
+                 duration: float, loop: bool = True, out: list = None) -> list:
+    """把 (last_time, time] 内触发的事件按顺序追加到 out 并返回
+
+    时间为未取模的播放时间；last_time 为 None 表示刚开始播放，0 时刻的事件也触发。
+    循环时跨过的每一圈各触发一次，圈内只做一次 bisect；不循环时 time 截止到 duration。
+    """
+    if out is None:
+        out = []
+    if timeline is None or not timeline.times:
+        return out
+    times = timeline.times
+    events = timeline.events
+
+    if not loop or duration <= 0:
+        if duration > 0:
+            time = min(time, duration)
+        start = 0 if last_time is None else bisect_right(times, last_time)
+        out.extend(events[start:bisect_right(times, time)])
+        return out
+
+    if last_time is None:
+        last_loop, start = 0, 0
+    else:
+        last_loop, last_offset = divmod(last_time, duration)
+        start = bisect_right(times, last_offset)
+    loop_index, offset = divmod(time, duration)
+    stop = bisect_right(times, offset)
+    if loop_index == last_loop:
+        out.extend(events[start:stop])
+        return out
+    # 跨圈：上一圈剩余部分 + 中间完整的圈 + 本圈开头
+    out.extend(events[start:])
+    for _ in range(int(loop_index - last_loop) - 1):
+        out.extend(events)
+    out.extend(events[:stop])
+    return out
@@ -0,0 +1,179 @@
+"""异步加载角色：后台线程解析 JSON / .atlas 并解码 PNG，主线程只做 convert_alpha 等收尾
+
+    loader = AsyncLoader()
+    handle = loader.load(atlas_path, json_path)
+    # 每帧：
+    for handle in loader.poll(budget=0.002):
+        atlas, json_loader, skeleton_data = handle.result()
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from atlas import Atlas
+from loader import SkeletonJson
+from profiler import perf_counter
+from textures import TEXTURE_CACHE, TextureCache, decode_page, load_page
+
+# 各阶段在总进度中的占比
+STAGE_WEIGHTS = {
+    "atlas": 0.05,
+    "json": 0.45,
+    "decode": 0.4,
+    "finalize": 0.1,
+}
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class LoadHandle:
+    """一次加载请求；progress 为 0..1，stage 为当前阶段"""
+    def __init__(self, atlas_path: str, json_path: str):
+        self.atlas_path = atlas_path
+        self.json_path = json_path
+        self.stage = "pending"
+        self.progress = 0.0
+        self.error = None
+        self.cancelled = False
+        self.future = None
+
+        self.atlas = None
+        self.json_loader = None
+        self.skeleton_data = None
+        self._decoded = []  # [(page, surface)]，等待主线程收尾
+        self._finalized = 0
+        self._done = threading.Event()
+
+    def _advance(self, stage: str, fraction: float = 1.0):
+        base = 0.0
+        for name, weight in STAGE_WEIGHTS.items():
+            if name == stage:
+                self.progress = base + weight * fraction
+                break
+            base += weight
+        self.stage = stage
+
+    def cancel(self):
+        """放弃加载；已在执行的后台步骤会在下一个阶段边界停止"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self):
+        """返回 (atlas, json_loader, skeleton_data)；加载失败时抛出原异常"""
+        if self.error is not None:
+            raise self.error
+        return self.atlas, self.json_loader, self.skeleton_data
+
+    def __repr__(self):
+        return f"LoadHandle({self.json_path!r}, {self.stage}, {self.progress:.0%})"
+
+
+class AsyncLoader:
+    """后台线程池加载器
+
+    后台线程只做纯数据解析与 pygame.image.load；convert_alpha 与写入 TEXTURE_CACHE
+    在主线程的 poll() 中按时间预算逐页完成，避免卡住帧循环。
+    """
+    def __init__(self, max_workers: int = 2):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spinal-load")
+        self.pending = []
+        self._lock = threading.Lock()
+        self._ready = []
+
+    def load(self, atlas_path: str, json_path: str) -> LoadHandle:
+        handle = LoadHandle(atlas_path, json_path)
+        handle.future = self.executor.submit(self._work, handle)
+        self.pending.append(handle)
+        return handle
+
+    def _check(self, handle: LoadHandle):
+        if handle.cancelled:
+            raise LoadCancelled(handle.json_path)
+
+    def _work(self, handle: LoadHandle):
+        try:
+            handle._advance("atlas", 0.0)
+            handle.atlas = Atlas(handle.atlas_path)
+            self._check(handle)
+
+            handle._advance("json", 0.0)
+            handle.json_loader = SkeletonJson(handle.atlas)
+            handle.skeleton_data = handle.json_loader.read_skeleton_data(handle.json_path)
+            self._check(handle)
+
+            pages = handle.atlas.pages
+            for i, page in enumerate(pages):
+                handle._advance("decode", i / len(pages))
+                self._check(handle)
+                # 已在共享缓存中的页面不必重复解码
+                if TextureCache.page_key(page.path) in TEXTURE_CACHE.entries:
+                    handle._decoded.append((page, None))
+                else:
+                    handle._decoded.append((page, decode_page(page.path)))
+            handle._advance("finalize", 0.0)
+        except BaseException as error:
+            handle.error = error
+        with self._lock:
+            self._ready.append(handle)
+
+    def _finalize(self, handle: LoadHandle, deadline: float) -> bool:
+        """在主线程上把解码好的页面转为显示格式并放入缓存；超出 deadline 时返回 False"""
+        decoded = handle._decoded
+        while handle._finalized < len(decoded):
+            if perf_counter() >= deadline and handle._finalized > 0:
+                return False
+            page, surface = decoded[handle._finalized]
+            try:
+                load_page(page, surface)
+            except Exception as error:
+                handle.error = error
+                return True
+            handle._finalized += 1
+            handle._advance("finalize", handle._finalized / len(decoded))
+        handle._decoded = []
+        return True
+
+    def poll(self, budget: float = 0.002) -> list:
+        """主线程每帧调用：在 budget 秒内完成收尾，返回本帧完成的 handle"""
+        deadline = perf_counter() + budget
+        with self._lock:
+            ready = list(self._ready)
+        # 还没开始执行就被取消的请求不会进入 _ready
+        for handle in [h for h in self.pending if h.future.cancelled()]:
+            handle.stage = "cancelled"
+            self.pending.remove(handle)
+            handle._done.set()
+
+        finished = []
+        for handle in ready:
+            if handle.error is None and not handle.cancelled and not self._finalize(handle, deadline):
+                # 时间用完，剩下的页面留到下一帧
+                break
+            if handle.error is None and not handle.cancelled:
+                handle.stage = "done"
+                handle.progress = 1.0
+            elif handle.cancelled:
+                handle.stage = "cancelled"
+            else:
+                handle.stage = "failed"
+            with self._lock:
+                self._ready.remove(handle)
+            self.pending.remove(handle)
+            handle._done.set()
+            if not handle.cancelled:
+                finished.append(handle)
+        return finished
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.pending)
+
+    def shutdown(self):
+        for handle in self.pending:
+            handle.cancel()
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -1,7 +1,27 @@
 import os
-import pygame
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# 贴图加载器由渲染层（textures.py）注册；纯数据工具不导入 pygame，贴图保持为 None
+_texture_loader: Optional[Callable[['TextureRegion'], None]] = None
+
+
+def set_texture_loader(loader: Optional[Callable[['TextureRegion'], None]]):
+    """注册贴图加载器：loader(region) 负责设置 region 的贴图"""
+    global _texture_loader
+    _texture_loader = loader
+
+
+@dataclass
+class AtlasPage:
+    """纹理页元数据，像素由渲染层按需解码"""
+    name: str = ""
+    path: str = ""
+    width: int = 0
+    height: int = 0
+    format: str = ""
+    atlas: Optional['Atlas'] = field(default=None, repr=False)
+    texture: Optional[object] = field(default=None, repr=False)
 
 
 @dataclass
@@ -17,42 +37,64 @@ class TextureRegion:
     u2: float = 1.0
     v2: float = 1.0
     rotate: bool = False
-    texture: Optional[pygame.Surface] = None
+    offset: Optional[List[float]] = None
+    page: Optional[AtlasPage] = field(default=None, repr=False)
+    _texture: Optional[object] = field(default=None, repr=False)
+
+    @property
+    def texture(self):
+        """首次访问时通过已注册的加载器取得贴图（pygame.Surface）"""
+        if self._texture is None and _texture_loader is not None and self.page is not None:
+            _texture_loader(self)
+        return self._texture
+
+    @texture.setter
+    def texture(self, value):
+        self._texture = value
+
+    @property
+    def loaded_texture(self):
+        """已加载的贴图，不触发加载"""
+        return self._texture
+
+    @property
+    def sub_rect(self):
+        """区域在页面中的矩形（旋转区域按页面中的实际朝向）"""
+        if self.rotate:
+            return (self.x, self.y, self.height, self.width)
+        return (self.x, self.y, self.width, self.height)
 
 
 class Atlas:
+    """解析 .atlas 元数据；不依赖 pygame"""
     def __init__(self, file_path: str):
+        self.path = file_path
+        self.pages: List[AtlasPage] = []
         self.regions: Dict[str, TextureRegion] = {}
         self.load(file_path)
 
     def load(self, atlas_path: str):
         atlas_dir = os.path.dirname(atlas_path)
-        
+
         with open(atlas_path, 'r') as f:
             lines = [line.rstrip('\n') for line in f.readlines()]  # 移除换行符
-        
+
         i = 0
-        current_page = None
-        texture = None  # 显式声明texture变量
-        
+        page = None
+
         while i < len(lines):
             line = lines[i].strip()
             if not line:
-                current_page = None
+                page = None
                 i += 1
                 continue
-            
+
             # 处理新纹理页
-            if not current_page:
-                texture_path = os.path.join(atlas_dir, line)
-                try:
-                    texture = pygame.image.load(texture_path).convert_alpha()
-                except pygame.error:
-                    print(f"无法加载纹理: {texture_path}")
-                    return
-                current_page = texture
-                
-                # 跳过纹理页属性（不使用的字段）
+            if not page:
+                page = AtlasPage(name=line, path=os.path.join(atlas_dir, line), atlas=self)
+                self.pages.append(page)
+
+                # 纹理页属性
                 i += 1
                 while i < len(lines):
                     line = lines[i].strip()
@@ -60,14 +102,22 @@ class Atlas:
                         break
                     if ':' not in line:  # 新区域开始
                         break
+                    key, value = line.split(':', 1)
+                    key = key.strip().lower()
+                    value = value.strip()
+                    if key == 'size':
+                        page.width, page.height = map(int, value.split(','))
+                    elif key == 'format':
+                        page.format = value
                     i += 1
                 continue
-            
+
             # 处理区域定义
             region = TextureRegion()
             region.name = line
+            region.page = page
             i += 1  # 移动到属性行
-            
+
             while i < len(lines):
                 line = lines[i].strip()
                 if not line:  # 空行表示区域结束
@@ -75,11 +125,11 @@ class Atlas:
                     break
                 if ':' not in line:  # 新区域开始
                     break
-                
+
                 key, value = line.split(':', 1)
                 key = key.strip().lower()
                 value = value.strip()
-                
+
                 if key == 'rotate':
                     region.rotate = (value == 'true')
                 elif key == 'xy':
@@ -89,43 +139,26 @@ class Atlas:
                 elif key == 'orig':
                     pass  # 原始尺寸不需要处理
                 elif key == 'offset':
-                    values = list(map(float, value.split(',')))
-                    region.offset = values
+                    region.offset = list(map(float, value.split(',')))
                 elif key == 'index':
                     pass  # 索引不需要处理
-                
+
                 i += 1  # 确保每次处理都递增
-            
-            # 计算UV坐标
-            if texture:
-                tex_width = texture.get_width()
-                tex_height = texture.get_height()
-
-                region.u = region.x / tex_width
-                region.v = region.y / tex_height
-
-                if region.rotate:
-                    region.u2 = (region.x + region.height) / tex_width
-                    region.v2 = (region.y + region.width) / tex_height
-                    sub_rect = (region.x, region.y, region.height, region.width)
-                else:
-                    region.u2 = (region.x + region.width) / tex_width
-                    region.v2 = (region.y + region.height) / tex_height
-                    sub_rect = (region.x, region.y, region.width, region.height)
-
-                # extract surface and rotate if needed
-                try:
-                    sub_surface = texture.subsurface(sub_rect)
-                    if region.rotate:
-                        sub_surface = pygame.transform.rotate(sub_surface, -90)
-                    region.texture = sub_surface
-                except ValueError:
-                    print(f"无效的纹理区域: {region.name}")
-                    continue
-
-            
+
+            self.compute_uvs(region)
             self.regions[region.name] = region
 
+    @staticmethod
+    def compute_uvs(region: TextureRegion):
+        """按页面尺寸计算 UV；页面缺少 size 时等贴图解码后再计算"""
+        page = region.page
+        if not page.width or not page.height:
+            return
+        x, y, w, h = region.sub_rect
+        region.u = x / page.width
+        region.v = y / page.height
+        region.u2 = (x + w) / page.width
+        region.v2 = (y + h) / page.height
+
     def find_region(self, name: str) -> Optional[TextureRegion]:
         return self.regions.get(name)
-
@@ -0,0 +1,267 @@
+"""基于 skel/ 示例角色的基准测试
+
+    python bench.py --output result.json
+    python bench.py --compare base.json result.json
+"""
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+import contextlib
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from atlas import Atlas
+from loader import SkeletonJson, find_characters
+from runtime import Skeleton
+from render import AttachmentSprite
+from operation import update_sprites_for_animation
+from playback import AnimationPlayer
+from lod import LodScheduler
+from memory import memory_report
+
+DEFAULT_SKEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skel")
+SURFACE_SIZE = (1280, 720)
+CROWD_GRID = (8, 6)  # 人群基准的网格，约一半在视口外
+FRAME_DT = 1 / 60
+# memory_report 中由 Surface 像素构成的类别
+SURFACE_CATEGORIES = ("atlas_pages", "atlas_region_copies", "surface_cache", "static_layers", "tint_cache")
+
+
+def summarize(samples: list) -> dict:
+    """中位数 / p95（最近秩）/ 最小值，单位毫秒"""
+    ordered = sorted(samples)
+    p95_index = max(0, min(len(ordered) - 1, int(round(0.95 * len(ordered) + 0.5)) - 1))
+    return {
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[p95_index] * 1000,
+        "min_ms": ordered[0] * 1000,
+        "runs": len(ordered),
+    }
+
+
+def time_call(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_memory(fn) -> int:
+    """单独跑一次测量峰值分配（tracemalloc 会拖慢计时，所以不和计时混在一起）"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def surface_memory(atlas=None, skeletons=()) -> int:
+    """SDL 分配的像素不经过 tracemalloc，按 memory.py 的口径统计图集页面与各缓存 Surface 的字节数"""
+    report = memory_report(atlas=atlas, skeletons=skeletons)
+    return sum(value for key, value in report.items() if key.split("[")[0] in SURFACE_CATEGORIES)
+
+
+def measure(fn, repeat: int, surfaces=None) -> dict:
+    """surfaces() 返回运行后 Surface 占用的字节数，记为 surface_bytes"""
+    result = summarize(time_call(fn, repeat))
+    result["peak_bytes"] = peak_memory(fn)
+    if surfaces is not None:
+        result["surface_bytes"] = surfaces()
+    return result
+
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽加载器和动画切换的调试输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_character(atlas_path: str, json_path: str, repeat: int, frames: int) -> dict:
+    result = {}
+    with quiet():
+        result["atlas_load"] = measure(lambda: Atlas(atlas_path), repeat)
+
+        atlas = Atlas(atlas_path)
+        result["read_skeleton_data"] = measure(lambda: SkeletonJson(atlas).read_skeleton_data(json_path), repeat)
+
+        json_loader = SkeletonJson(atlas)
+        skeleton_data = json_loader.read_skeleton_data(json_path)
+        result["skeleton_init"] = measure(lambda: Skeleton(skeleton_data), repeat)
+
+        surface = pygame.Surface(SURFACE_SIZE)
+        animations = {}
+        for animation in skeleton_data.animations:
+            skeleton = Skeleton(skeleton_data)
+            sprites = []
+
+            def switch():
+                update_sprites_for_animation(animation.name, skeleton_data, skeleton, json_loader,
+                                             sprites, AttachmentSprite)
+
+            entry = {"update_sprites": measure(switch, repeat)}
+            switch()
+            entry["update_world_transform"] = measure(skeleton.update_world_transform, frames)
+
+            # 每帧推进动画时间，避免贴图与静态图层缓存吸收全部工作
+            player = AnimationPlayer(skeleton)
+            player.set_animation(animation)
+            skeleton.pose_source = player
+
+            def draw_frame():
+                player.update(FRAME_DT)
+                skeleton.draw(surface)
+
+            draw_frame()  # 预热缓存
+            entry["draw"] = measure(draw_frame, frames, lambda: surface_memory(atlas, [skeleton]))
+            animations[animation.name] = entry
+        result["animations"] = animations
+        result["crowd"] = bench_crowd(skeleton_data, repeat, frames, atlas)
+    return result
+
+
+def bench_crowd(skeleton_data, repeat: int, frames: int, atlas=None) -> dict:
+    """网格排布的多个骨架：全部满帧更新 vs LodScheduler 分级"""
+    surface = pygame.Surface(SURFACE_SIZE)
+    columns, rows = CROWD_GRID
+    spacing = 250  # 屏幕像素
+    animation = skeleton_data.animations[0] if skeleton_data.animations else None
+    if animation is not None and animation.bounds is None:
+        # LOD 策略按预计算包围盒分级
+        Skeleton(skeleton_data).bake_bounds(animation)
+
+    def build(policy):
+        scheduler = LodScheduler(SURFACE_SIZE, policy)
+        for i in range(columns * rows):
+            skeleton = Skeleton(skeleton_data)
+            settings = skeleton.render_settings
+            settings.scale = 0.4 if i % 2 else 0.15
+            settings.position_x = ((i % columns) - columns / 2) * spacing / settings.scale
+            settings.position_y = ((i // columns) - rows / 2) * spacing / settings.scale
+            player = AnimationPlayer(skeleton)
+            player.set_animation(animation)
+            skeleton.pose_source = player
+            scheduler.add(skeleton, player)
+        return scheduler
+
+    result = {}
+    for name, policy in (("full", lambda skeleton, viewport: "full"), ("lod", None)):
+        scheduler = build(policy)
+
+        def frame():
+            scheduler.update(FRAME_DT)
+            scheduler.draw(surface)
+
+        frame()  # 预热缓存
+        result[name] = summarize(time_call(frame, frames))
+        result[name]["surface_bytes"] = surface_memory(atlas, [entry.skeleton for entry in scheduler.entries])
+        if name == "lod":
+            result["lod_counts"] = dict(scheduler.counts)
+    return result
+
+
+def run_benchmarks(skel_dir: str = DEFAULT_SKEL_DIR, names=None, repeat: int = 5, frames: int = 60,
+                   characters=None) -> dict:
+    """characters 为 [(name, atlas_path, json_path)]，缺省扫描 skel_dir；不初始化显示设备"""
+    if characters is None:
+        characters = find_characters(skel_dir)
+
+    results = {}
+    for name, atlas_path, json_path in characters:
+        if names and name not in names:
+            continue
+        results[name] = bench_character(atlas_path, json_path, repeat, frames)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "frames": frames,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "characters": results,
+    }
+
+
+def flatten(result: dict) -> dict:
+    """展开为 {'xianghe/animations/attack/draw': stats}"""
+    flat = {}
+
+    def walk(prefix, node):
+        if "median_ms" in node:
+            flat[prefix] = node
+            return
+        for key, value in node.items():
+            if isinstance(value, dict):
+                walk(f"{prefix}/{key}" if prefix else key, value)
+
+    walk("", result.get("characters", {}))
+    return flat
+
+
+def compare(base: dict, new: dict, threshold: float = 0.1) -> list:
+    """对比两次结果的中位数，返回 [(key, base_ms, new_ms, ratio, regressed)]"""
+    base_flat = flatten(base)
+    new_flat = flatten(new)
+    rows = []
+    for key in sorted(base_flat.keys() & new_flat.keys()):
+        base_ms = base_flat[key]["median_ms"]
+        new_ms = new_flat[key]["median_ms"]
+        ratio = new_ms / base_ms if base_ms > 0 else float("inf")
+        rows.append((key, base_ms, new_ms, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(rows: list):
+    for key, base_ms, new_ms, ratio, regressed in rows:
+        mark = "REGRESSION" if regressed else ""
+        print(f"{key:60s} {base_ms:10.3f} -> {new_ms:10.3f} ms  x{ratio:5.2f} {mark}")
+    regressions = sum(1 for row in rows if row[4])
+    print(f"{len(rows)} metrics, {regressions} regressions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="spinALrcp benchmark")
+    parser.add_argument("--skel-dir", default=DEFAULT_SKEL_DIR)
+    parser.add_argument("--names", nargs="*", help="只测这些角色")
+    parser.add_argument("--repeat", type=int, default=5, help="加载类阶段的重复次数")
+    parser.add_argument("--frames", type=int, default=60, help="逐帧阶段的采样帧数")
+    parser.add_argument("--output", help="结果 JSON 路径，缺省输出到 stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="对比两个结果文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="判定回退的相对阈值")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            new = json.load(f)
+        rows = compare(base, new, args.threshold)
+        print_comparison(rows)
+        return 1 if any(row[4] for row in rows) else 0
+
+    result = run_benchmarks(args.skel_dir, args.names, args.repeat, args.frames)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
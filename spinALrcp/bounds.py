@@ -0,0 +1,202 @@
+"""向量化的骨架包围盒：区域附件四角一次性用 numpy 变换，不逐顶点构造列表
+
+四角按 RegionAttachment.compute_world_vertices 的方式由附件中心展开，但尺寸、缩放与角度约定
+取 transform_attachment 实际绘制的贴图，保证包围盒覆盖画出来的像素。包围盒为 (x0, y0, x1, y1)，只依赖 numpy。
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from mytypes import AttachmentType
+from pose import SkeletonPose
+from animation import apply_animation
+
+
+class RegionTable:
+    """一个皮肤中所有区域附件的本地四角 (K, 4, 2) 与所属骨骼下标
+
+    行顺序与 skin.attachments 的键顺序一致，因此 pose_workers 的附件编号可以直接当行号用。
+    非区域附件（裁剪、包围盒）与没有贴图区域的附件 valid 为 False。
+    """
+    def __init__(self, skeleton_data, skin=None):
+        skin = skin or skeleton_data.default_skin
+        self.skin = skin
+        bone_indices = {id(bone_data): i for i, bone_data in enumerate(skeleton_data.bones)}
+        keys = list(skin.attachments.keys()) if skin else []
+
+        self.corners = np.zeros((len(keys), 4, 2), dtype=np.float64)
+        self.bone_index = np.zeros(len(keys), dtype=np.intp)
+        self.valid = np.zeros(len(keys), dtype=bool)
+        # 同一个附件对象可能出现在多个插槽下，行号按 (插槽下标, id(attachment)) 查找
+        self.rows = {}
+        self.slot_indices = {id(slot_data): i for i, slot_data in enumerate(skeleton_data.slots)}
+        signs = ((-1, -1), (1, -1), (1, 1), (-1, 1))
+        for k, key in enumerate(keys):
+            attachment = skin.attachments[key]
+            slot_index = key[0]
+            self.bone_index[k] = bone_indices[id(skeleton_data.slots[slot_index].bone_data)]
+            self.rows[(slot_index, id(attachment))] = k
+            if attachment.type != AttachmentType.Region or attachment.region is None:
+                continue
+            # 绘制的是区域贴图本身（已转回原始朝向），尺寸取区域大小
+            region = attachment.region
+            width = region.width or attachment.width
+            height = region.height or attachment.height
+            half_w = width * attachment.scaleX / 2
+            half_h = height * attachment.scaleY / 2
+            # 附件角度与骨骼矩阵同一约定（a=cos, b=sin, c=-sin, d=cos）
+            rad = math.radians(attachment.rotation)
+            cos_r = math.cos(rad)
+            sin_r = math.sin(rad)
+            for i, (sx, sy) in enumerate(signs):
+                lx = sx * half_w
+                ly = sy * half_h
+                self.corners[k, i] = (attachment.x + lx * cos_r + ly * sin_r,
+                                      attachment.y - lx * sin_r + ly * cos_r)
+            self.valid[k] = True
+
+    def slot_rows(self, slots) -> np.ndarray:
+        """插槽当前附件对应的行号，无附件或不在此皮肤中为 -1"""
+        rows = self.rows
+        slot_indices = self.slot_indices
+        return np.fromiter((rows.get((slot_indices.get(id(slot.data)), id(slot.attachment)), -1) for slot in slots),
+                           dtype=np.intp, count=len(slots))
+
+
+def capture_matrices(skeleton) -> np.ndarray:
+    """(B, 6) 世界矩阵 a, b, c, d, world_x, world_y"""
+    return np.array([(bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y)
+                     for bone in skeleton.all_bones], dtype=np.float64)
+
+
+def batch_bounds(table: RegionTable, poses: np.ndarray, rows: np.ndarray, bones: np.ndarray = None) -> np.ndarray:
+    """一批骨架的世界包围盒
+
+    poses: (N, B, 6) 世界矩阵；rows: (N, S) 每个插槽的附件行号（-1 表示无附件）；
+    bones: (N, S) 附件跟随的骨骼下标，缺省为附件所在插槽的骨骼。
+    返回 (N, 4)，没有可见附件的骨架为 NaN。
+    """
+    poses = np.asarray(poses, dtype=np.float64)
+    rows = np.asarray(rows)
+    if table.corners.shape[0] == 0 or rows.size == 0:
+        return np.full((poses.shape[0], 4), np.nan)
+    safe_rows = np.where(rows >= 0, rows, 0)
+    visible = (rows >= 0) & table.valid[safe_rows]
+
+    corners = table.corners[safe_rows]                 # (N, S, 4, 2)
+    if bones is None:
+        bones = table.bone_index[safe_rows]            # (N, S)
+    matrices = np.take_along_axis(poses, bones[..., None], axis=1)  # (N, S, 6)
+    a, b, c, d, x, y = (matrices[..., i, None] for i in range(6))
+    local_x = corners[..., 0]
+    local_y = corners[..., 1]
+    world_x = local_x * a + local_y * b + x            # (N, S, 4)
+    world_y = local_x * c + local_y * d + y
+
+    mask = ~visible[..., None]
+    world_x = np.where(mask, np.nan, world_x).reshape(len(poses), -1)
+    world_y = np.where(mask, np.nan, world_y).reshape(len(poses), -1)
+    result = np.full((len(poses), 4), np.nan)
+    any_visible = visible.any(axis=1)
+    if any_visible.any():
+        result[any_visible, 0] = np.nanmin(world_x[any_visible], axis=1)
+        result[any_visible, 1] = np.nanmin(world_y[any_visible], axis=1)
+        result[any_visible, 2] = np.nanmax(world_x[any_visible], axis=1)
+        result[any_visible, 3] = np.nanmax(world_y[any_visible], axis=1)
+    return result
+
+
+def world_bounds(skeleton, table: RegionTable = None, pose: np.ndarray = None,
+                 rows: np.ndarray = None, bones: np.ndarray = None) -> Optional[tuple]:
+    """单个骨架的世界包围盒；pose 缺省时从骨骼读取世界矩阵，rows 缺省为各插槽当前附件"""
+    if table is None:
+        table = RegionTable(skeleton.data, skeleton.skin)
+    if pose is None:
+        pose = capture_matrices(skeleton)
+    if rows is None:
+        rows = table.slot_rows(skeleton.slots)
+    box = batch_bounds(table, pose[None], rows[None], None if bones is None else bones[None])[0]
+    if np.isnan(box[0]):
+        return None
+    return tuple(float(v) for v in box)
+
+
+def to_screen(box, settings, surface_size) -> tuple:
+    """世界包围盒 -> 屏幕包围盒（与 transform_attachment 的 px/py 相同映射）"""
+    center_x = surface_size[0] // 2
+    center_y = surface_size[1] // 2
+    scale = settings.scale
+    x0 = center_x + (box[0] + settings.position_x) * scale
+    x1 = center_x + (box[2] + settings.position_x) * scale
+    y0 = center_y + (box[1] + settings.position_y) * scale
+    y1 = center_y + (box[3] + settings.position_y) * scale
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+@dataclass
+class BakedBounds:
+    """按固定帧率预先采样的动画世界包围盒，boxes 为 (F, 4)，第 i 帧对应 i / fps 秒"""
+    fps: float
+    duration: float
+    boxes: np.ndarray
+
+    def at(self, time: float, loop: bool = True) -> Optional[tuple]:
+        """time 所在两帧包围盒的并集（保守）"""
+        count = len(self.boxes)
+        if count == 0:
+            return None
+        if loop and self.duration > 0:
+            time %= self.duration
+        frame = time * self.fps
+        first = min(max(int(frame), 0), count - 1)
+        second = min(first + 1, count - 1)
+        a = self.boxes[first]
+        b = self.boxes[second]
+        if np.isnan(a[0]) and np.isnan(b[0]):
+            return None
+        return (float(np.fmin(a[0], b[0])), float(np.fmin(a[1], b[1])),
+                float(np.fmax(a[2], b[2])), float(np.fmax(a[3], b[3])))
+
+
+def bake_poses(skeleton_data, animation, times, skin=None):
+    """按 times 逐帧采样动画（不循环），返回 (poses (F, B, 6), rows (F, S), RegionTable)
+
+    rows 为每帧各插槽当前附件在 RegionTable 中的行号，插槽按 SkeletonData.slots 顺序。
+    """
+    skeleton = SkeletonPose(skeleton_data)
+    if skin is not None:
+        skeleton.set_skin(skin)
+    table = RegionTable(skeleton_data, skeleton.skin)
+    poses = np.empty((len(times), len(skeleton.all_bones), 6))
+    rows = np.empty((len(times), len(skeleton.slots)), dtype=np.intp)
+    for frame, time in enumerate(times):
+        apply_animation(skeleton, animation, float(time), loop=False)
+        for bone in skeleton.all_bones:
+            bone.update_world_transform()
+        poses[frame] = capture_matrices(skeleton)
+        rows[frame] = table.slot_rows(skeleton.slots)
+    return poses, rows, table
+
+
+def bake_bounds(skeleton_data, animation, fps: float = None, skin=None,
+                rows: np.ndarray = None, bones: np.ndarray = None) -> BakedBounds:
+    """逐帧采样动画并计算包围盒，结果记在 animation.bounds 上
+
+    rows/bones 缺省时每帧取各插槽当前附件；给出时（如 Skeleton.bake_bounds 传入绘制项）每帧使用同一组附件。
+    """
+    fps = fps or skeleton_data.fps or 30
+    frame_count = max(1, int(math.ceil(animation.duration * fps)) + 1)
+    times = [min(frame / fps, animation.duration) for frame in range(frame_count)]
+    poses, frame_rows, table = bake_poses(skeleton_data, animation, times, skin)
+
+    if rows is None:
+        rows = frame_rows
+    else:
+        rows = np.broadcast_to(rows, (frame_count, len(rows)))
+        if bones is not None:
+            bones = np.broadcast_to(bones, (frame_count, len(bones)))
+    baked = BakedBounds(fps, animation.duration, batch_bounds(table, poses, rows, bones))
+    animation.bounds = baked
+    return baked
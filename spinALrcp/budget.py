@@ -0,0 +1,112 @@
+"""贴图预算管理：只保留活动骨架当前动画用到的图集页面"""
+import weakref
+
+from operation import get_attachment_names_for_animation
+from textures import TEXTURE_CACHE, TextureCache, release_page_textures
+
+
+def collect_regions(skeleton) -> list:
+    """骨架当前动画（未设置动画时为整个皮肤）会用到的 TextureRegion"""
+    skin = skeleton.skin
+    if not skin:
+        return []
+    data = skeleton.data
+    names = None
+    if skeleton.animation_name is not None:
+        animation = next((a for a in data.animations if a.name == skeleton.animation_name), None)
+        if animation is not None:
+            names = get_attachment_names_for_animation(animation)
+            names.update(slot.attachment_name for slot in data.slots if slot.attachment_name)
+
+    regions = []
+    for (slot_index, name), attachment in skin.attachments.items():
+        if names is not None and name not in names:
+            continue
+        region = getattr(attachment, "region", None)
+        if region is not None:
+            regions.append(region)
+    return regions
+
+
+class TextureBudget:
+    """跟踪活动骨架引用的页面；超出预算时按 LRU 换出无人引用的页面
+
+    被换出的页面在下次访问贴图时由 textures 透明地重新加载，计入 TEXTURE_CACHE.reloads。
+    """
+    def __init__(self, budget_bytes: int = 32 * 1024 * 1024, cache: TextureCache = TEXTURE_CACHE):
+        self.budget_bytes = budget_bytes
+        self.cache = cache
+        self.skeletons = weakref.WeakSet()
+        self._working_sets = weakref.WeakKeyDictionary()  # skeleton -> (key, pages)
+
+        self.evictions = 0
+        self.enforced = 0
+
+    def track(self, skeleton):
+        self.skeletons.add(skeleton)
+
+    def untrack(self, skeleton):
+        self.skeletons.discard(skeleton)
+        self._working_sets.pop(skeleton, None)
+
+    def working_set(self, skeleton) -> list:
+        """当前动画引用的页面，按 (皮肤, 动画名) 缓存"""
+        key = (id(skeleton.skin), skeleton.animation_name)
+        cached = self._working_sets.get(skeleton)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        pages = {}
+        for region in collect_regions(skeleton):
+            if region.page is not None:
+                pages[id(region.page)] = region.page
+        pages = list(pages.values())
+        self._working_sets[skeleton] = (key, pages)
+        return pages
+
+    def active_pages(self) -> set:
+        """活动页面的缓存 key（同一 PNG 的多个 Atlas 共用一个 key）"""
+        keys = set()
+        for skeleton in list(self.skeletons):
+            for page in self.working_set(skeleton):
+                keys.add(TextureCache.page_key(page.path))
+        return keys
+
+    def enforce(self) -> int:
+        """超出预算时换出不在任何工作集中的页面，返回本次换出的页面数"""
+        self.enforced += 1
+        cache = self.cache
+        if cache.total_bytes <= self.budget_bytes:
+            return 0
+
+        active = self.active_pages()
+        resident = {}
+        for atlas in cache.owners():
+            for page in atlas.pages:
+                if page.texture is not None:
+                    resident.setdefault(TextureCache.page_key(page.path), []).append(page)
+
+        evicted = 0
+        # entries 的顺序即 LRU 顺序
+        for key in list(cache.entries):
+            if cache.total_bytes <= self.budget_bytes:
+                break
+            if key in active:
+                continue
+            for page in resident.get(key, ()):
+                release_page_textures(page)
+            if cache.evict(key):
+                evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def stats(self) -> dict:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "resident_bytes": self.cache.total_bytes,
+            "resident_pages": len(self.cache.entries),
+            "evictions": self.evictions,
+            "reloads": self.cache.reloads,
+        }
+
+
+TEXTURE_BUDGET = TextureBudget()
@@ -0,0 +1,276 @@
+"""命令行入口：python -m spinALrcp <mode> ...
+
+    view     交互式查看器
+    render   无头渲染动画帧为 PNG
+    bench    基准测试
+    inspect  打印骨架统计与内存报告
+    convert  JSON 精简（数值取整、去缩进）
+
+路径参数可以是 .json（同名 .atlas）或包含若干角色的目录。
+除 view 外的模式（以及 view --check）都不初始化显示设备，可以在没有显示的机器上运行。
+"""
+import os
+import io
+import json
+import argparse
+import contextlib
+
+DEFAULT_SKEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skel")
+
+
+def resolve_characters(paths, atlas_path=None) -> list:
+    """把 .json / 目录参数展开为 [(name, atlas_path, json_path)]"""
+    from loader import find_characters
+
+    characters = []
+    for path in paths or [DEFAULT_SKEL_DIR]:
+        if os.path.isdir(path):
+            characters.extend(find_characters(path))
+            continue
+        if not os.path.exists(path):
+            raise SystemExit(f"找不到文件: {path}")
+        name = os.path.splitext(os.path.basename(path))[0]
+        atlas = atlas_path or os.path.splitext(path)[0] + ".atlas"
+        characters.append((name, atlas, path))
+    if atlas_path and len(characters) > 1:
+        raise SystemExit("--atlas 只能和单个 .json 一起使用")
+    return characters
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """屏蔽加载器的调试输出"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def load(atlas_path: str, json_path: str, verbose: bool = False):
+    from atlas import Atlas
+    from loader import SkeletonJson
+
+    with quiet(not verbose):
+        atlas = Atlas(atlas_path)
+        json_loader = SkeletonJson(atlas)
+        skeleton_data = json_loader.read_skeleton_data(json_path)
+    return atlas, json_loader, skeleton_data
+
+
+def parse_size(text: str):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def cmd_view(args):
+    if args.check:
+        return check_view(args)
+    from main import run_viewer
+
+    name, atlas_path, json_path = resolve_characters(args.paths, args.atlas)[0]
+    run_viewer(atlas_path, json_path, parse_size(args.size))
+    return 0
+
+
+def check_view(args):
+    """无头检查查看器的附件拾取：点击绘制出的附件应返回该附件"""
+    from main import check_picking
+
+    status = 0
+    for name, atlas_path, json_path in resolve_characters(args.paths, args.atlas):
+        with quiet(not args.verbose):
+            failures = check_picking(atlas_path, json_path, parse_size(args.size))
+        print(f"{name}: {'ok' if not failures else f'{len(failures)} pick failures'}")
+        for attachment_name, point, picked in failures[:10]:
+            print(f"  {attachment_name} at {point} -> {picked}")
+        if failures:
+            status = 1
+    return status
+
+
+def cmd_render(args):
+    import pygame
+    from runtime import Skeleton
+    from animation import apply_animation
+    from pipeline import FramePipeline
+
+    size = parse_size(args.size)
+    os.makedirs(args.output, exist_ok=True)
+    for name, atlas_path, json_path in resolve_characters(args.paths, args.atlas):
+        _, _, skeleton_data = load(atlas_path, json_path, args.verbose)
+        animations = skeleton_data.animations
+        if args.animation:
+            animations = [a for a in animations if a.name in args.animation]
+
+        for animation in animations:
+            skeleton = Skeleton(skeleton_data)
+            skeleton.render_settings.scale = args.scale
+            skeleton.render_settings.debug_points = not args.no_debug
+            frame_count = args.frames or max(1, int(round(animation.duration * args.fps)) + 1)
+
+            def prepare(frame):
+                apply_animation(skeleton, animation, frame / args.fps, loop=True)
+                return skeleton.prepare_frame(size)
+
+            # 第 N+1 帧的姿态与变换在工作线程准备，同时主线程合成并保存第 N 帧
+            pipeline = FramePipeline(prepare, enabled=not args.sequential)
+            pipeline.submit(0)
+            for frame in range(frame_count):
+                prepared = pipeline.wait()
+                if frame + 1 < frame_count:
+                    pipeline.submit(frame + 1)
+                surface = pygame.Surface(size, pygame.SRCALPHA)
+                if args.background:
+                    surface.fill(pygame.Color(args.background))
+                skeleton.present_frame(surface, prepared)
+                path = os.path.join(args.output, f"{name}_{animation.name}_{frame:04d}.png")
+                pygame.image.save(surface, path)
+            pipeline.close()
+            print(f"{name}/{animation.name}: {frame_count} frames")
+    return 0
+
+
+def cmd_bench(args):
+    import bench
+
+    if args.compare:
+        return bench.main(["--compare", *args.compare, "--threshold", str(args.threshold)])
+
+    characters = resolve_characters(args.paths, args.atlas)
+    result = bench.run_benchmarks(repeat=args.repeat, frames=args.frames, characters=characters)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+def describe(skeleton_data) -> list:
+    attachment_types = {}
+    for skin in skeleton_data.skins:
+        for attachment in skin.attachments.values():
+            type_name = attachment.type.name
+            attachment_types[type_name] = attachment_types.get(type_name, 0) + 1
+
+    lines = [
+        f"spine {skeleton_data.version}  size {skeleton_data.width:.0f}x{skeleton_data.height:.0f}",
+        f"bones {len(skeleton_data.bones)}  slots {len(skeleton_data.slots)}  skins {len(skeleton_data.skins)}",
+        "attachments " + "  ".join(f"{k} {v}" for k, v in sorted(attachment_types.items())),
+        f"animations {len(skeleton_data.animations)}",
+    ]
+    for animation in skeleton_data.animations:
+        keys = sum(len(timeline.frames) for timeline in animation.bone_timelines)
+        lines.append(f"    {animation.name:20s} {animation.duration:7.3f}s  "
+                     f"bone timelines {len(animation.bone_timelines):4d}  keys {keys:5d}  "
+                     f"slot timelines {len(animation.slot_timelines)}")
+    return lines
+
+
+def cmd_inspect(args):
+    from memory import memory_report, format_report
+    from textures import load_atlas_textures
+
+    for name, atlas_path, json_path in resolve_characters(args.paths, args.atlas):
+        atlas, json_loader, skeleton_data = load(atlas_path, json_path, args.verbose)
+        if args.textures:
+            load_atlas_textures(atlas)
+        print(f"== {name} ==")
+        print(f"atlas regions {len(atlas.regions)}")
+        for line in describe(skeleton_data):
+            print(line)
+        print()
+        print(format_report(memory_report(skeleton_data, atlas, json_loader=json_loader)))
+        print()
+    return 0
+
+
+def round_floats(node, precision: int):
+    if isinstance(node, float):
+        value = round(node, precision)
+        return int(value) if value.is_integer() else value
+    if isinstance(node, dict):
+        return {key: round_floats(value, precision) for key, value in node.items()}
+    if isinstance(node, list):
+        return [round_floats(value, precision) for value in node]
+    return node
+
+
+def cmd_convert(args):
+    for name, atlas_path, json_path in resolve_characters(args.paths):
+        with open(json_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if args.precision is not None:
+            raw = round_floats(raw, args.precision)
+
+        if len(args.paths) == 1 and not os.path.isdir(args.paths[0]) and args.output.endswith(".json"):
+            output = args.output
+        else:
+            os.makedirs(args.output, exist_ok=True)
+            output = os.path.join(args.output, name + ".json")
+        separators = None if args.indent else (",", ":")
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False, indent=args.indent, separators=separators)
+        print(f"{json_path} -> {output}  {os.path.getsize(json_path)} -> {os.path.getsize(output)} bytes")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m spinALrcp", description="spinALrcp 工具")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    def add_paths(p, atlas=True):
+        p.add_argument("paths", nargs="*", help=".json 文件或目录，缺省为 skel/")
+        if atlas:
+            p.add_argument("--atlas", help="单个 .json 时指定 .atlas，缺省为同名文件")
+        p.add_argument("-v", "--verbose", action="store_true", help="显示加载器输出")
+
+    p = sub.add_parser("view", help="交互式查看器")
+    add_paths(p)
+    p.add_argument("--size", default="1280x720")
+    p.add_argument("--check", action="store_true", help="不打开窗口，只检查点击附件能否拾取到它")
+    p.set_defaults(func=cmd_view)
+
+    p = sub.add_parser("render", help="无头渲染 PNG 帧")
+    add_paths(p)
+    p.add_argument("-o", "--output", default="frames")
+    p.add_argument("--animation", nargs="*", help="只渲染这些动画")
+    p.add_argument("--fps", type=float, default=30)
+    p.add_argument("--frames", type=int, help="每个动画的帧数，缺省覆盖整个时长")
+    p.add_argument("--size", default="1280x720")
+    p.add_argument("--scale", type=float, default=1.0)
+    p.add_argument("--background", help="背景色（如 #202030），缺省透明")
+    p.add_argument("--sequential", action="store_true", help="不使用流水线，逐帧顺序计算与绘制")
+    p.add_argument("--no-debug", action="store_true", help="不绘制附件中心的调试红点")
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("bench", help="基准测试")
+    add_paths(p)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--frames", type=int, default=60)
+    p.add_argument("-o", "--output")
+    p.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    p.add_argument("--threshold", type=float, default=0.1)
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("inspect", help="骨架统计与内存报告")
+    add_paths(p)
+    p.add_argument("--textures", action="store_true", help="解码全部图集页面后再统计（页面默认延迟加载）")
+    p.set_defaults(func=cmd_inspect)
+
+    p = sub.add_parser("convert", help="JSON 精简")
+    add_paths(p, atlas=False)
+    p.add_argument("-o", "--output", required=True, help="输出 .json（单个输入）或目录")
+    p.add_argument("--precision", type=int, default=4, help="浮点保留位数，负数表示不取整")
+    p.add_argument("--indent", type=int, help="缩进，缺省为紧凑格式")
+    p.set_defaults(func=cmd_convert)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "precision", None) is not None and args.precision < 0:
+        args.precision = None
+    return args.func(args)
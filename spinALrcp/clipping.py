@@ -0,0 +1,105 @@
+"""裁剪附件：只对区域附件做多边形 Alpha 遮罩（网格附件不绘制，因此没有三角形裁剪）"""
+from typing import Optional
+
+import pygame
+
+
+def apply_clip_mask(texture: pygame.Surface, topleft, polygon) -> Optional[pygame.Surface]:
+    """区域附件的遮罩裁剪：返回多边形外像素 Alpha 置零的副本（不修改 texture），完全裁掉时返回 None"""
+    left = int(topleft[0])
+    top = int(topleft[1])
+    xs = polygon[0::2]
+    ys = polygon[1::2]
+    clip_rect = pygame.Rect(int(min(xs)), int(min(ys)),
+                            int(max(xs) - min(xs)) + 1, int(max(ys) - min(ys)) + 1)
+    rect = texture.get_rect(topleft=(left, top))
+    if not rect.colliderect(clip_rect):
+        return None
+
+    texture = texture.copy()
+    mask = pygame.Surface(rect.size, pygame.SRCALPHA)
+    mask.fill((255, 255, 255, 0))
+    points = [(xs[i] - left, ys[i] - top) for i in range(len(xs))]
+    pygame.draw.polygon(mask, (255, 255, 255, 255), points)
+    texture.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return texture
+
+
+class AttachmentPolygon:
+    """多边形附件实例：骨骼空间顶点常驻，骨骼变换变化时才重新计算世界/屏幕多边形"""
+    def __init__(self, attachment, bone, slot_index: int, skeleton_bones=None):
+        self.attachment = attachment
+        self.bone = bone
+        self.slot_index = slot_index
+        self.skeleton_bones = skeleton_bones
+
+        # 带权重时参与变换的骨骼索引
+        self.weight_bones = []
+        bones = attachment.bones
+        i = 0
+        while i < len(bones):
+            count = bones[i]
+            self.weight_bones.extend(bones[i + 1:i + 1 + count])
+            i += count + 1
+        self.weight_bones = sorted(set(self.weight_bones))
+
+        self._bone_key = None
+        self._world = None
+        self._screen_key = None
+        self._screen = None
+
+    def _get_bone_key(self):
+        if not self.attachment.bones:
+            bone = self.bone
+            return (bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y)
+        bones = self.skeleton_bones
+        return tuple((bones[i].a, bones[i].b, bones[i].c, bones[i].d, bones[i].world_x, bones[i].world_y)
+                     for i in self.weight_bones)
+
+    def world_polygon(self) -> list:
+        key = self._get_bone_key()
+        if key != self._bone_key:
+            self._bone_key = key
+            self._world = self.attachment.compute_world_vertices(self.bone, self.skeleton_bones)
+            self.on_world_changed()
+        return self._world
+
+    def on_world_changed(self):
+        pass
+
+    def screen_polygon(self, center_x: float, center_y: float, settings) -> list:
+        world = self.world_polygon()
+        key = (self._bone_key, center_x, center_y, settings.scale, settings.position_x, settings.position_y)
+        if key != self._screen_key:
+            self._screen_key = key
+            scale = settings.scale
+            screen = []
+            for i in range(0, len(world), 2):
+                screen.append(center_x + (world[i] + settings.position_x) * scale)
+                screen.append(center_y + (world[i + 1] + settings.position_y) * scale)
+            self._screen = screen
+            self.on_screen_changed()
+        return self._screen
+
+    def on_screen_changed(self):
+        pass
+
+
+class ClipPolygon(AttachmentPolygon):
+    """生效中的裁剪附件，按绘制顺序作用于裁剪插槽之后、直到 end 插槽（含）的插槽"""
+    def __init__(self, attachment, bone, slot_index: int, end_index: int, skeleton_bones=None):
+        super().__init__(attachment, bone, slot_index, skeleton_bones)
+        self.end_index = end_index
+
+    def covers(self, slot_index: int, positions=None) -> bool:
+        """positions[插槽下标] 为插槽在当前绘制顺序中的位置，缺省为 setup 顺序
+
+        与 Spine 相同，end 插槽画在裁剪插槽之前时一直裁剪到最后。
+        """
+        if positions is None:
+            start, end, position = self.slot_index, self.end_index, slot_index
+        else:
+            start, end, position = positions[self.slot_index], positions[self.end_index], positions[slot_index]
+        if end < start:
+            return position > start
+        return start < position <= end
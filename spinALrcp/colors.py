@@ -0,0 +1,104 @@
+"""打包的插槽颜色：所有插槽的 RGBA 存为 (S, 4) float32，color / twoColor 时间轴按数组一次采样
+
+缓动曲线在加载时展开为等距查找表，采样时不再逐帧求解贝塞尔。只依赖 numpy。
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from animation import curve_percent
+
+CURVE_SAMPLES = 16  # 每段缓动曲线的查找表分段数
+COLOR_COMPONENTS = 7  # light RGBA + dark RGB
+
+
+def pack_colors(colors) -> np.ndarray:
+    """Color 列表 -> (N, 4) float32"""
+    return np.array([(color.r, color.g, color.b, color.a) for color in colors],
+                    dtype=np.float32).reshape(-1, 4)
+
+
+def parse_hex(text: str, components: int = 4) -> tuple:
+    """"rrggbbaa" / "rrggbb" -> 0..1 浮点分量，缺少的 alpha 补 1"""
+    values = [int(text[i:i + 2], 16) / 255.0 for i in range(0, min(len(text), components * 2), 2)]
+    return tuple(values + [1.0] * (components - len(values)))
+
+
+def curve_table(curve) -> np.ndarray:
+    """把前一关键帧的曲线展开为 CURVE_SAMPLES + 1 个等距采样"""
+    return np.array([curve_percent(curve, i / CURVE_SAMPLES) for i in range(CURVE_SAMPLES + 1)],
+                    dtype=np.float32)
+
+
+@dataclass
+class ColorTimelines:
+    """一个动画的全部 color / twoColor 时间轴
+
+    slot_indices (T,)；times (T, F)，帧数不足 F 的用 inf 填充；values (T, F, 7) float32；
+    curves (T, F, CURVE_SAMPLES + 1) 缓动查找表；two_color (T,) 是否写入 dark 颜色。
+    """
+    slot_indices: np.ndarray
+    times: np.ndarray
+    values: np.ndarray
+    curves: np.ndarray
+    two_color: np.ndarray
+
+    @classmethod
+    def compile(cls, timelines: List[tuple]) -> Optional['ColorTimelines']:
+        """timelines: [(slot_index, two_color, [(time, values(7), curve), ...])]，关键帧按时间升序"""
+        if not timelines:
+            return None
+        count = len(timelines)
+        frame_count = max(len(frames) for _, _, frames in timelines)
+        times = np.full((count, frame_count), np.inf)
+        values = np.ones((count, frame_count, COLOR_COMPONENTS), dtype=np.float32)
+        curves = np.zeros((count, frame_count, CURVE_SAMPLES + 1), dtype=np.float32)
+        for t, (_, _, frames) in enumerate(timelines):
+            for f, (time, frame_values, curve) in enumerate(frames):
+                times[t, f] = time
+                values[t, f] = frame_values
+                curves[t, f] = curve_table(curve)
+        return cls(
+            slot_indices=np.array([slot_index for slot_index, _, _ in timelines], dtype=np.intp),
+            times=times,
+            values=values,
+            curves=curves,
+            two_color=np.array([two_color for _, two_color, _ in timelines], dtype=bool),
+        )
+
+    def sample(self, time: float):
+        """返回 (active (T,), values (T, 7))；早于第一帧的时间轴 active 为 False"""
+        times = self.times
+        rows = np.arange(len(times))
+        index = np.count_nonzero(times <= time, axis=1) - 1
+        active = index >= 0
+        current = np.maximum(index, 0)
+        following = np.minimum(current + 1, times.shape[1] - 1)
+
+        start = times[rows, current]
+        span = times[rows, following] - start
+        moving = (following > current) & np.isfinite(span) & (span > 0)
+        percent = np.zeros(len(times))
+        np.divide(time - start, span, out=percent, where=moving)
+        np.clip(percent, 0.0, 1.0, out=percent)
+
+        # 查找表线性插值得到缓动后的进度
+        position = percent * CURVE_SAMPLES
+        low = np.minimum(position.astype(np.intp), CURVE_SAMPLES - 1)
+        fraction = position - low
+        table = self.curves[rows, current]
+        eased = table[rows, low] * (1 - fraction) + table[rows, low + 1] * fraction
+
+        first = self.values[rows, current]
+        second = self.values[rows, following]
+        return active, first + (second - first) * eased[:, None].astype(np.float32)
+
+    def apply(self, time: float, colors: np.ndarray, dark_colors: np.ndarray):
+        """把 time 时刻的颜色写入 (S, 4) colors 与 (S, 3) dark_colors"""
+        active, values = self.sample(time)
+        slot_indices = self.slot_indices
+        colors[slot_indices[active]] = values[active, :4]
+        two_color = active & self.two_color
+        if two_color.any():
+            dark_colors[slot_indices[two_color]] = values[two_color, 4:]
@@ -0,0 +1,261 @@
+"""骨骼姿态 golden：对 skel/ 下每个角色的每个动画按固定时刻采样，
+保存所有骨骼世界矩阵 a/b/c/d/x/y 与插槽附件，用来验证优化后的变换路径
+
+    python golden.py dump
+    python golden.py check --engine scalar --tolerance 1e-3
+    python golden.py check --engine pool     # pose_workers.PosePool
+    python golden.py check --engine baked    # bounds.bake_poses
+    python golden.py check --engine render   # runtime.Skeleton 实际绘制的附件
+"""
+import os
+import io
+import sys
+import argparse
+import contextlib
+
+import numpy as np
+
+from atlas import Atlas
+from loader import SkeletonJson, find_characters
+from pose import SkeletonPose
+from animation import apply_animation
+from bounds import bake_poses
+from mytypes import AttachmentType
+
+DEFAULT_SKEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skel")
+
+DEFAULT_GOLDEN_DIR = os.path.join(DEFAULT_SKEL_DIR, "golden")
+DEFAULT_SAMPLES = 10
+POSE_COMPONENTS = ("a", "b", "c", "d", "world_x", "world_y")
+
+
+def capture_pose(skeleton):
+    """返回 (bones(B, 6), attachments[S])，顺序与 SkeletonData 一致"""
+    pose = np.array([[bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y]
+                     for bone in skeleton.all_bones], dtype=np.float64)
+    attachments = [slot.attachment.name if slot.attachment else None for slot in skeleton.slots]
+    return pose, attachments
+
+
+def scalar_engine(skeleton, animation, time):
+    """参考实现：逐骨骼 Bone.update_world_transform"""
+    apply_animation(skeleton, animation, time, loop=False)
+    for bone in skeleton.all_bones:
+        bone.update_world_transform()
+    return capture_pose(skeleton)
+
+
+@contextlib.contextmanager
+def scalar(atlas_path, json_path, skeleton_data):
+    yield scalar_engine
+
+
+@contextlib.contextmanager
+def pool(atlas_path, json_path, skeleton_data):
+    """pose_workers.PosePool：在工作进程中计算，经共享内存读回"""
+    from pose_workers import PosePool
+
+    with PosePool(atlas_path, json_path, instances=1, workers=1,
+                  skeleton_data=skeleton_data, loop=False) as pose_pool:
+        keys = pose_pool.attachment_keys
+
+        def engine(skeleton, animation, time):
+            pose_pool.set(0, animation.name, time)
+            pose_pool.step()
+            attachments = [keys[k][1] if k >= 0 else None for k in pose_pool.front_attachments[0].tolist()]
+            return pose_pool.front[0].copy(), attachments
+        yield engine
+
+
+@contextlib.contextmanager
+def baked(atlas_path, json_path, skeleton_data):
+    """bounds.bake_poses：预烘焙路径的采样与附件行号"""
+    def engine(skeleton, animation, time):
+        poses, rows, table = bake_poses(skeleton_data, animation, [time], skeleton.skin)
+        keys = list(table.skin.attachments.keys()) if table.skin else []
+        return poses[0], [keys[k][1] if k >= 0 else None for k in rows[0].tolist()]
+    yield engine
+
+
+@contextlib.contextmanager
+def render(atlas_path, json_path, skeleton_data):
+    """runtime.Skeleton：区域附件取自绘制项，附件关键帧必须改变实际绘制的附件
+
+    非区域附件（裁剪、包围盒、网格）不绘制，仍取插槽上的附件。
+    """
+    from runtime import Skeleton
+
+    with _quiet():
+        skeleton = Skeleton(skeleton_data)
+    slot_indices = [i for i, slot in enumerate(skeleton.slots_by_index) if slot is not None]
+
+    def engine(_, animation, time):
+        pose, names = scalar_engine(skeleton, animation, time)
+        drawn = {slot_index: attachment.name for _, attachment, slot_index in skeleton.get_ordered_draw_items()}
+        for j, slot_index in enumerate(slot_indices):
+            attachment = skeleton.slots_by_index[slot_index].attachment
+            if attachment is not None and attachment.type == AttachmentType.Region:
+                names[j] = drawn.get(slot_index)
+        return pose, names
+    yield engine
+
+
+# 姿态引擎：ENGINES[name](atlas_path, json_path, skeleton_data) 是上下文管理器，
+# 产出 engine(skeleton, animation, time) -> (bones(B, 6), attachments[S])
+ENGINES = {
+    "scalar": scalar,
+    "pool": pool,
+    "baked": baked,
+    "render": render,
+}
+
+
+def sample_times(duration: float, samples: int) -> np.ndarray:
+    if duration <= 0:
+        return np.zeros(1)
+    return np.linspace(0.0, duration, samples)
+
+
+@contextlib.contextmanager
+def _quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def load_character(atlas_path: str, json_path: str):
+    with _quiet():
+        atlas = Atlas(atlas_path)
+        return SkeletonJson(atlas).read_skeleton_data(json_path)
+
+
+def dump_golden(skeleton_data, path: str, samples: int = DEFAULT_SAMPLES, engine=scalar_engine):
+    """写出一个角色的 .npz golden"""
+    skeleton = SkeletonPose(skeleton_data)
+    attachment_names = []
+    attachment_ids = {}
+    arrays = {
+        "bone_names": np.array([bone.name for bone in skeleton_data.bones]),
+        "slot_names": np.array([slot.name for slot in skeleton_data.slots]),
+        "animation_names": np.array([animation.name for animation in skeleton_data.animations]),
+    }
+    for i, animation in enumerate(skeleton_data.animations):
+        times = sample_times(animation.duration, samples)
+        poses = []
+        attachments = []
+        for time in times:
+            pose, names = engine(skeleton, animation, float(time))
+            poses.append(pose)
+            row = []
+            for name in names:
+                if name is None:
+                    row.append(-1)
+                    continue
+                if name not in attachment_ids:
+                    attachment_ids[name] = len(attachment_names)
+                    attachment_names.append(name)
+                row.append(attachment_ids[name])
+            attachments.append(row)
+        # 采样时刻保持 float64，避免关键帧边界上的取整差异
+        arrays[f"times_{i}"] = times
+        arrays[f"bones_{i}"] = np.array(poses, dtype=np.float32)
+        arrays[f"attachments_{i}"] = np.array(attachments, dtype=np.int32)
+    arrays["attachment_names"] = np.array(attachment_names)
+    np.savez_compressed(path, **arrays)
+
+
+def compare_golden(skeleton_data, path: str, engine=scalar_engine, tolerance: float = 1e-3, top: int = 10) -> dict:
+    """用 engine 重新计算 golden 中的每个采样点，返回误差报告
+
+    {"max_error", "worst": [(error, animation, time, bone, component)], "attachment_mismatches": [...], "passed"}
+    """
+    golden = np.load(path)
+    bone_names = [str(name) for name in golden["bone_names"]]
+    slot_names = [str(name) for name in golden["slot_names"]]
+    attachment_names = [str(name) for name in golden["attachment_names"]]
+    if bone_names != [bone.name for bone in skeleton_data.bones]:
+        raise ValueError(f"{path}: 骨骼列表与骨架数据不一致")
+
+    animations = {animation.name: animation for animation in skeleton_data.animations}
+    skeleton = SkeletonPose(skeleton_data)
+    worst_by_bone = {}
+    mismatches = []
+    max_error = 0.0
+    for i, animation_name in enumerate(golden["animation_names"]):
+        animation = animations.get(str(animation_name))
+        if animation is None:
+            mismatches.append((str(animation_name), None, None, "missing animation", None))
+            continue
+        expected_poses = golden[f"bones_{i}"]
+        expected_attachments = golden[f"attachments_{i}"]
+        for t, time in enumerate(golden[f"times_{i}"]):
+            pose, names = engine(skeleton, animation, float(time))
+            diff = np.abs(np.asarray(pose, dtype=np.float64) - expected_poses[t])
+            worst = diff.max(axis=1)
+            max_error = max(max_error, float(worst.max(initial=0.0)))
+            # 每根骨骼只保留误差最大的一次采样
+            for bone_index in np.flatnonzero(worst > 0):
+                error = float(worst[bone_index])
+                bone_name = bone_names[bone_index]
+                previous = worst_by_bone.get(bone_name)
+                if previous is None or error > previous[0]:
+                    component = POSE_COMPONENTS[int(diff[bone_index].argmax())]
+                    worst_by_bone[bone_name] = (error, animation.name, float(time), bone_name, component)
+
+            for slot_index, expected in enumerate(expected_attachments[t]):
+                expected_name = attachment_names[expected] if expected >= 0 else None
+                if names[slot_index] != expected_name:
+                    mismatches.append((animation.name, float(time), slot_names[slot_index],
+                                       expected_name, names[slot_index]))
+
+    worst = sorted(worst_by_bone.values(), key=lambda row: row[0], reverse=True)
+    return {
+        "max_error": max_error,
+        "worst": worst[:top],
+        "attachment_mismatches": mismatches,
+        "passed": max_error <= tolerance and not mismatches,
+    }
+
+
+def print_report(name: str, report: dict, tolerance: float):
+    status = "ok" if report["passed"] else "FAILED"
+    print(f"{name}: max error {report['max_error']:.3g} (tolerance {tolerance:g}) {status}")
+    if not report["passed"]:
+        for error, animation, time, bone, component in report["worst"]:
+            print(f"    {error:10.3g}  {animation:16s} t={time:7.4f}  {bone}.{component}")
+        for mismatch in report["attachment_mismatches"][:10]:
+            print(f"    attachment {mismatch}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="spinALrcp pose goldens")
+    parser.add_argument("mode", choices=("dump", "check"))
+    parser.add_argument("--skel-dir", default=DEFAULT_SKEL_DIR)
+    parser.add_argument("--golden-dir", default=DEFAULT_GOLDEN_DIR)
+    parser.add_argument("--names", nargs="*", help="只处理这些角色")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="每个动画的采样时刻数")
+    parser.add_argument("--engine", default="scalar", choices=sorted(ENGINES))
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--top", type=int, default=10, help="报告误差最大的骨骼数")
+    args = parser.parse_args(argv)
+
+    make_engine = ENGINES[args.engine]
+    failed = False
+    for name, atlas_path, json_path in find_characters(args.skel_dir):
+        if args.names and name not in args.names:
+            continue
+        skeleton_data = load_character(atlas_path, json_path)
+        path = os.path.join(args.golden_dir, name + ".npz")
+        with make_engine(atlas_path, json_path, skeleton_data) as engine:
+            if args.mode == "dump":
+                os.makedirs(args.golden_dir, exist_ok=True)
+                dump_golden(skeleton_data, path, args.samples, engine)
+                print(f"{name}: {path}")
+            else:
+                report = compare_golden(skeleton_data, path, engine, args.tolerance, args.top)
+                print_report(name, report, args.tolerance)
+                failed = failed or not report["passed"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
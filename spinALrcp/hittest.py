@@ -0,0 +1,36 @@
+from clipping import AttachmentPolygon
+
+
+def point_in_polygon(x: float, y: float, polygon: list) -> bool:
+    """奇偶规则判断点是否在多边形内（polygon 为扁平坐标）"""
+    inside = False
+    n = len(polygon) // 2
+    j = n - 1
+    for i in range(n):
+        xi = polygon[i * 2]
+        yi = polygon[i * 2 + 1]
+        xj = polygon[j * 2]
+        yj = polygon[j * 2 + 1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class BoundingPolygon(AttachmentPolygon):
+    """包围盒附件实例，屏幕多边形附带 AABB 用于快速排除"""
+    def __init__(self, attachment, bone, slot_index: int, skeleton_bones=None):
+        super().__init__(attachment, bone, slot_index, skeleton_bones)
+        self.aabb = None
+
+    def on_screen_changed(self):
+        xs = self._screen[0::2]
+        ys = self._screen[1::2]
+        self.aabb = (min(xs), min(ys), max(xs), max(ys)) if xs else None
+
+    def contains(self, x: float, y: float, center_x: float, center_y: float, settings) -> bool:
+        polygon = self.screen_polygon(center_x, center_y, settings)
+        aabb = self.aabb
+        if aabb is None or not (aabb[0] <= x <= aabb[2] and aabb[1] <= y <= aabb[3]):
+            return False
+        return point_in_polygon(x, y, polygon)
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+
+import pygame
+
+from profiler import PROFILER, perf_counter
+
+
+class TextCache:
+    """按 (文本, 颜色) 缓存渲染好的文字 Surface，内容不变时不再调用 font.render"""
+    def __init__(self, font, max_entries: int = 128):
+        self.font = font
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text: str, color=(0, 0, 0)) -> pygame.Surface:
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        surface = self.font.render(text, True, color)
+        self.misses += 1
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+def _hit_rate(cache):
+    """兼容 hits/misses 与 hits/builds 两种计数"""
+    misses = getattr(cache, "misses", None)
+    if misses is None:
+        misses = getattr(cache, "builds", 0)
+    total = cache.hits + misses
+    return cache.hits / total if total else None
+
+
+class FrameHUD:
+    """帧时间叠加层：帧时间、p95、超预算帧、各阶段耗时、缓存命中率、Surface 分配
+
+    数据来自 PROFILER；文字按 refresh_interval 刷新并经 TextCache 缓存，
+    两次刷新之间只是把同一批 Surface 加入绘制列表。
+    """
+    TEXT_COLOR = (230, 230, 230)
+    WARN_COLOR = (255, 90, 90)
+    GOOD_COLOR = (120, 230, 120)
+
+    def __init__(self, font, target_fps: int = 60, tolerance_ms: float = 1.0,
+                 refresh_interval: float = 0.25, max_phases: int = 8):
+        self.font = font
+        self.text_cache = TextCache(font)
+        self.budget_ms = 1000.0 / target_fps
+        self.tolerance_ms = tolerance_ms
+        self.refresh_interval = refresh_interval
+        self.max_phases = max_phases
+
+        self.visible = False
+        self.caches = []  # [(name, cache)]
+
+        self.violations = 0
+        self.worst_ms = 0.0
+        self._checked_frame = -1
+        self._last_refresh = None
+        self._lines = []
+        self._panel = None
+
+    def add_cache(self, name: str, cache):
+        """登记需要显示命中率的缓存（带 hits 以及 misses 或 builds 计数），同名时替换"""
+        self.caches = [(n, c) for n, c in self.caches if n != name]
+        self.caches.append((name, cache))
+
+    def remove_caches(self, *caches):
+        """注销这些缓存对象（如切换后被替换的骨架所持有的缓存）"""
+        self.caches = [(n, c) for n, c in self.caches if not any(c is cache for cache in caches)]
+
+    def toggle(self):
+        """显示时同时打开 PROFILER，隐藏时恢复关闭"""
+        self.visible = not self.visible
+        PROFILER.enable(self.visible)
+        self.violations = 0
+        self.worst_ms = 0.0
+        self._last_refresh = None
+        self._lines = []
+
+    def _track_budget(self):
+        """每帧检查上一帧是否超出预算"""
+        if PROFILER.frames == 0 or PROFILER.frames - 1 == self._checked_frame:
+            return
+        self._checked_frame = PROFILER.frames - 1
+        frame_ms = PROFILER.frame_times[-1] * 1000
+        if frame_ms > self.budget_ms + self.tolerance_ms:
+            self.violations += 1
+        self.worst_ms = max(self.worst_ms, frame_ms)
+
+    def _build_lines(self):
+        frame = PROFILER.get_frame_stats()
+        limit = self.budget_ms + self.tolerance_ms
+        over = sum(1 for t in PROFILER.frame_times if t * 1000 > limit)
+        color = self.WARN_COLOR if frame["p95_ms"] > limit else self.GOOD_COLOR
+
+        lines = [
+            (f"frame {frame['last_ms']:5.1f} ms  p95 {frame['p95_ms']:5.1f}  budget {self.budget_ms:4.1f}", color),
+            (f"over budget {over}/{len(PROFILER.frame_times)}  total {self.violations}  worst {self.worst_ms:5.1f}",
+             self.WARN_COLOR if over else self.TEXT_COLOR),
+        ]
+
+        phases = PROFILER.get_phase_stats()
+        ordered = sorted(phases.items(), key=lambda item: item[1]["mean_ms"], reverse=True)
+        for phase, stats in ordered[:self.max_phases]:
+            lines.append((f"{phase:22s} {stats['mean_ms']:6.2f}  p95 {stats['p95_ms']:6.2f}", self.TEXT_COLOR))
+
+        for name, cache in self.caches:
+            rate = _hit_rate(cache)
+            text = "-" if rate is None else f"{rate * 100:5.1f}%"
+            lines.append((f"cache {name:16s} {text}", self.TEXT_COLOR))
+
+        for name, stats in sorted(PROFILER.get_counter_stats().items()):
+            lines.append((f"alloc {name:16s} {stats['last']:4d}/frame  max {stats['max']}",
+                          self.WARN_COLOR if stats["last"] else self.TEXT_COLOR))
+
+        self._lines = [self.text_cache.render(text, color) for text, color in lines]
+
+    def _get_panel(self, width: int, height: int) -> pygame.Surface:
+        panel = self._panel
+        if panel is None or panel.get_size() != (width, height):
+            panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 170))
+            self._panel = panel
+        return panel
+
+    def draw(self, draw_list, position=(10, 130)):
+        """把叠加层加入绘制列表；需在 PROFILER.end_frame() 之后、下一帧提交之前调用"""
+        if not self.visible:
+            return
+        self._track_budget()
+
+        now = perf_counter()
+        if self._last_refresh is None or now - self._last_refresh >= self.refresh_interval:
+            self._last_refresh = now
+            self._build_lines()
+        if not self._lines:
+            return
+
+        line_height = self.font.get_linesize()
+        width = max(line.get_width() for line in self._lines) + 12
+        height = line_height * len(self._lines) + 8
+        x, y = position
+        draw_list.add(self._get_panel(width, height), (x, y))
+        for i, line in enumerate(self._lines):
+            draw_list.add(line, (x + 6, y + 4 + i * line_height))
@@ -1,3 +1,4 @@
+import os
 import json
 from skeleton_data import (
     SkeletonData, 
@@ -6,14 +7,46 @@ from skeleton_data import (
     Skin, 
     RegionAttachment, 
     MeshAttachment,
+    ClippingAttachment,
+    BoundingBoxAttachment,
     Attachment,
     Animation,  # 添加 Animation 导入
-    AnimationSlotTimeline
+    AttachmentTimeline,
+    AnimationBoneTimeline,
+    EventData,
+    Event,
+    EventTimeline,
+    DrawOrderTimeline
 )
 from mytypes import Color, AttachmentType
 from atlas import Atlas
+from colors import ColorTimelines, parse_hex
 from typing import Optional, Dict, List, Tuple
 
+# 骨骼时间轴缺省值（rotate 为角度，其余为 x, y）
+BONE_TIMELINE_DEFAULTS = {
+    "rotate": (0,),
+    "translate": (0, 0),
+    "scale": (1, 1),
+    "shear": (0, 0),
+}
+
+# JSON 中的附件类型名（小写）-> AttachmentType
+ATTACHMENT_TYPES = {t.name.lower(): t for t in AttachmentType}
+
+def find_characters(skel_dir: str) -> list:
+    """返回目录下成对的 (name, atlas_path, json_path)"""
+    characters = []
+    for file_name in sorted(os.listdir(skel_dir)):
+        name, ext = os.path.splitext(file_name)
+        if ext != ".json":
+            continue
+        atlas_path = os.path.join(skel_dir, name + ".atlas")
+        if os.path.exists(atlas_path):
+            characters.append((name, atlas_path, os.path.join(skel_dir, file_name)))
+    return characters
+
+
 class SkeletonJson:
     """骨骼JSON加载器，基于SpineViewer重新实现"""
     
@@ -22,6 +55,8 @@ class SkeletonJson:
         self.scale = 1.0
         self.raw = None 
         self.string_table: List[str] = []
+        # 内容相同的绘制顺序共用一个元组，渲染端按引用缓存
+        self._draw_orders: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
         
     def read_skeleton_data(self, path: str) -> SkeletonData:
         """读取骨骼数据"""
@@ -35,6 +70,8 @@ class SkeletonJson:
             skeleton = self.raw["skeleton"]
             skeleton_data.hash = skeleton.get("hash")
             skeleton_data.version = skeleton.get("spine")
+            skeleton_data.x = skeleton.get("x", 0) * self.scale
+            skeleton_data.y = skeleton.get("y", 0) * self.scale
             skeleton_data.width = skeleton.get("width", 0) * self.scale 
             skeleton_data.height = skeleton.get("height", 0) * self.scale
             skeleton_data.images_path = skeleton.get("images")
@@ -52,6 +89,10 @@ class SkeletonJson:
         if "skins" in self.raw:
             self._read_skins(self.raw["skins"], skeleton_data)
             
+        # 读取事件定义
+        if "events" in self.raw:
+            self._read_events(self.raw["events"], skeleton_data)
+
         # 读取动画
         if "animations" in self.raw:
             self._read_animations(self.raw["animations"], skeleton_data)
@@ -125,6 +166,10 @@ class SkeletonJson:
                         int(color_str[4:6], 16) / 255.0,  # B
                         int(color_str[6:8], 16) / 255.0   # A
                     )
+
+            # 双色染色的暗部颜色 (RRGGBB)
+            if "dark" in slot_map:
+                slot_data.dark_color = Color(*parse_hex(slot_map["dark"], 3))
                     
             # 处理混合模式
             if "blend" in slot_map:
@@ -205,13 +250,33 @@ class SkeletonJson:
     def _read_attachment(self, attachment_map: dict, name: str) -> Optional[Attachment]:
         """解析附件数据"""
         type_name = attachment_map.get("type", "region")
-        attachment_type = AttachmentType[type_name.title()]
+        attachment_type = ATTACHMENT_TYPES[type_name.lower()]
         path = attachment_map.get("path", name)
         
         if attachment_type == AttachmentType.Region:
-            # RegionAttachment 部分保持不变...
-            pass
-            
+            region = self.atlas.find_region(path)
+            if not region:
+                print(f"[WARNING] Region not found for: {path}")
+                return None
+
+            attachment = RegionAttachment(
+                name=name,
+                path=path,
+                x=attachment_map.get("x", 0) * self.scale,
+                y=attachment_map.get("y", 0) * self.scale,
+                scaleX=attachment_map.get("scaleX", 1),
+                scaleY=attachment_map.get("scaleY", 1),
+                rotation=attachment_map.get("rotation", 0),
+                width=attachment_map.get("width", region.width) * self.scale,
+                height=attachment_map.get("height", region.height) * self.scale,
+                region=region
+            )
+
+            if "color" in attachment_map:
+                attachment.color = self._parse_color(attachment_map["color"])
+
+            return attachment
+
         elif attachment_type == AttachmentType.Mesh:
             region = self.atlas.find_region(path)
             if not region:
@@ -280,11 +345,171 @@ class SkeletonJson:
                 mesh.edges = attachment_map["edges"]
                 
             return mesh
+
+        elif attachment_type == AttachmentType.Clipping:
+            vertex_count = attachment_map.get("vertexCount", 0)
+            raw_vertices = attachment_map.get("vertices", [])
+            clipping = ClippingAttachment(
+                name=name,
+                type=attachment_type,
+                end_slot=attachment_map.get("end"),
+                vertex_count=vertex_count
+            )
+            self._read_vertices(clipping, raw_vertices, vertex_count)
+
+            if "color" in attachment_map:
+                clipping.color = self._parse_color(attachment_map["color"])
+
+            return clipping
+
+        elif attachment_type == AttachmentType.BoundingBox:
+            vertex_count = attachment_map.get("vertexCount", 0)
+            bounding_box = BoundingBoxAttachment(
+                name=name,
+                type=attachment_type,
+                vertex_count=vertex_count
+            )
+            self._read_vertices(bounding_box, attachment_map.get("vertices", []), vertex_count)
+
+            if "color" in attachment_map:
+                bounding_box.color = self._parse_color(attachment_map["color"])
+
+            return bounding_box
             
         print(f"[SKIP] Unsupported attachment type: {attachment_type.name} (name: {name})")
         return None
     
         
+    def _read_vertices(self, attachment, raw_vertices: List[float], vertex_count: int):
+        """解析顶点：长度等于 vertexCount * 2 为骨骼空间坐标，否则为带权重格式"""
+        if len(raw_vertices) == vertex_count * 2:
+            attachment.vertices = [v * self.scale for v in raw_vertices]
+            attachment.bones = []
+            return
+
+        bones = []
+        vertices = []
+        i = 0
+        while i < len(raw_vertices):
+            bone_count = int(raw_vertices[i])
+            bones.append(bone_count)
+            i += 1
+            for _ in range(bone_count):
+                bones.append(int(raw_vertices[i]))
+                vertices.append(raw_vertices[i + 1] * self.scale)
+                vertices.append(raw_vertices[i + 2] * self.scale)
+                vertices.append(raw_vertices[i + 3])
+                i += 4
+        attachment.vertices = vertices
+        attachment.bones = bones
+
+    def _read_events(self, events_data: Dict, skeleton_data: SkeletonData):
+        """解析事件定义"""
+        for name, event_map in events_data.items():
+            skeleton_data.events[name] = EventData(
+                name=name,
+                int_value=event_map.get("int", 0),
+                float_value=event_map.get("float", 0.0),
+                string_value=event_map.get("string", ""),
+                audio_path=event_map.get("audio"),
+                volume=event_map.get("volume", 1.0),
+                balance=event_map.get("balance", 0.0),
+            )
+
+    def _read_event_timeline(self, frames: List[dict], skeleton_data: SkeletonData) -> Optional[EventTimeline]:
+        """事件关键帧按时间稳定排序；未定义的事件名跳过"""
+        events = []
+        for frame in frames:
+            event_data = skeleton_data.events.get(frame.get("name"))
+            if event_data is None:
+                print(f"[WARNING] Event not found: {frame.get('name')}")
+                continue
+            events.append(Event(
+                data=event_data,
+                time=frame.get("time", 0),
+                int_value=frame.get("int", event_data.int_value),
+                float_value=frame.get("float", event_data.float_value),
+                string_value=frame.get("string", event_data.string_value),
+                volume=frame.get("volume", event_data.volume),
+                balance=frame.get("balance", event_data.balance),
+            ))
+        if not events:
+            return None
+        events.sort(key=lambda event: event.time)
+        return EventTimeline(times=[event.time for event in events], events=events)
+
+    def _read_attachment_timeline(self, slot_name: str, frames: List[dict],
+                                  skeleton_data: SkeletonData) -> Optional[AttachmentTimeline]:
+        """附件关键帧编译为升序的时间与附件名数组，插槽名在加载时解析为下标"""
+        slot_index = self._find_slot_index(slot_name, skeleton_data.slots)
+        if slot_index < 0:
+            print(f"[WARNING] Slot not found for attachment timeline: {slot_name}")
+            return None
+        keys = sorted(((frame.get("time", 0), frame["name"]) for frame in frames if "name" in frame),
+                      key=lambda key: key[0])
+        if not keys:
+            return None
+        return AttachmentTimeline(
+            slot_name=slot_name,
+            slot_index=slot_index,
+            times=[time for time, _ in keys],
+            names=[name for _, name in keys],
+        )
+
+    def _read_color_timeline(self, slot_name: str, timelines: dict, skeleton_data: SkeletonData) -> Optional[tuple]:
+        """color / twoColor 关键帧 -> (slot_index, two_color, [(time, light RGBA + dark RGB, curve)])"""
+        two_color = "twoColor" in timelines
+        frames = timelines.get("twoColor") if two_color else timelines.get("color")
+        if not frames:
+            return None
+        slot_index = self._find_slot_index(slot_name, skeleton_data.slots)
+        if slot_index < 0:
+            return None
+        keys = []
+        for frame in frames:
+            if two_color:
+                values = parse_hex(frame.get("light", "ffffffff")) + parse_hex(frame.get("dark", "000000"), 3)[:3]
+            else:
+                values = parse_hex(frame.get("color", "ffffffff")) + (0.0, 0.0, 0.0)
+            keys.append((frame.get("time", 0), values, self._read_curve(frame)))
+        keys.sort(key=lambda key: key[0])
+        return slot_index, two_color, keys
+
+    def _read_draw_order_timeline(self, frames: List[dict], skeleton_data: SkeletonData) -> Optional[DrawOrderTimeline]:
+        """把每个关键帧的 offsets 展开为完整的插槽下标排列，播放时只需切换数组"""
+        slot_count = len(skeleton_data.slots)
+        timeline = DrawOrderTimeline()
+        for frame in sorted(frames, key=lambda frame: frame.get("time", 0)):
+            offsets = []
+            for offset_map in frame.get("offsets") or ():
+                slot_index = self._find_slot_index(offset_map["slot"], skeleton_data.slots)
+                if slot_index < 0:
+                    print(f"[WARNING] Slot not found for draw order: {offset_map['slot']}")
+                    continue
+                offsets.append((slot_index, offset_map["offset"]))
+            timeline.times.append(frame.get("time", 0))
+            order = self._draw_order(offsets, slot_count) if offsets else None
+            timeline.orders.append(self._draw_orders.setdefault(order, order) if order else None)
+        return timeline if timeline.times else None
+
+    @staticmethod
+    def _draw_order(offsets: List[Tuple[int, int]], slot_count: int) -> Tuple[int, ...]:
+        """按 Spine 的规则由 (插槽下标, 偏移) 计算绘制顺序：移动的插槽先就位，其余按原顺序填空"""
+        draw_order = [-1] * slot_count
+        unchanged = []
+        original_index = 0
+        for slot_index, offset in sorted(offsets):
+            while original_index != slot_index:
+                unchanged.append(original_index)
+                original_index += 1
+            draw_order[original_index + offset] = original_index
+            original_index += 1
+        unchanged.extend(range(original_index, slot_count))
+        for i in range(slot_count - 1, -1, -1):
+            if draw_order[i] == -1:
+                draw_order[i] = unchanged.pop()
+        return tuple(draw_order)
+
     def _read_animations(self, animations_data: Dict, skeleton_data: SkeletonData):
         """解析动画数据"""
         for anim_name, anim_map in animations_data.items():
@@ -292,34 +517,74 @@ class SkeletonJson:
             duration = 0
             
             # 从时间轴中找出最长的持续时间
-            if "slots" in anim_map:
-                for slot_data in anim_map["slots"].values():
-                    for timeline in slot_data.values():
+            for group in ("slots", "bones"):
+                for timelines in anim_map.get(group, {}).values():
+                    for timeline in timelines.values():
                         if isinstance(timeline, list) and timeline:
                             last_frame = timeline[-1]
-                            if isinstance(last_frame, dict) and "time" in last_frame:
-                                duration = max(duration, last_frame["time"])
+                            if isinstance(last_frame, dict):
+                                duration = max(duration, last_frame.get("time", 0))
+            for key in ("events", "drawOrder"):
+                for frame in anim_map.get(key, []):
+                    duration = max(duration, frame.get("time", 0))
             
             animation = Animation(name=anim_name, duration=duration)
             slot_timelines = []
+            color_timelines = []
             
             slots = anim_map.get("slots", {})
             for slot_name, timelines in slots.items():
-                slot_timeline = AnimationSlotTimeline(slot_name=slot_name, timelines=[])
-                
+                color_timeline = self._read_color_timeline(slot_name, timelines, skeleton_data)
+                if color_timeline is not None:
+                    color_timelines.append(color_timeline)
+
                 if "attachment" in timelines:
-                    for frame in timelines["attachment"]:
-                        if "name" in frame:
-                            slot_timeline.timelines.append({
-                                "time": frame["time"],
-                                "name": frame["name"]
-                            })
-                            
-                if slot_timeline.timelines:
-                    slot_timelines.append(slot_timeline)
+                    slot_timeline = self._read_attachment_timeline(slot_name, timelines["attachment"], skeleton_data)
+                    if slot_timeline is not None:
+                        slot_timelines.append(slot_timeline)
                     
             animation.slot_timelines = slot_timelines
+            animation.color_timelines = ColorTimelines.compile(color_timelines)
+
+            for bone_name, timelines in anim_map.get("bones", {}).items():
+                for timeline_type, frames in timelines.items():
+                    defaults = BONE_TIMELINE_DEFAULTS.get(timeline_type)
+                    if defaults is None:
+                        continue
+                    bone_timeline = AnimationBoneTimeline(bone_name=bone_name, type=timeline_type)
+                    for frame in frames:
+                        if timeline_type == "rotate":
+                            # 3.8 使用 angle，更早的导出使用 value
+                            values = (frame.get("angle", frame.get("value", defaults[0])),)
+                        else:
+                            values = (frame.get("x", defaults[0]), frame.get("y", defaults[1]))
+                        bone_timeline.frames.append({
+                            "time": frame.get("time", 0),
+                            "values": values,
+                            "curve": self._read_curve(frame),
+                        })
+                    if bone_timeline.frames:
+                        animation.bone_timelines.append(bone_timeline)
+
+            if "events" in anim_map:
+                animation.event_timeline = self._read_event_timeline(anim_map["events"], skeleton_data)
+            # 3.7 之前的导出写作 draworder
+            draw_order_frames = anim_map.get("drawOrder", anim_map.get("draworder"))
+            if draw_order_frames:
+                animation.draw_order_timeline = self._read_draw_order_timeline(draw_order_frames, skeleton_data)
+
             skeleton_data.animations.append(animation)
+
+    @staticmethod
+    def _read_curve(frame: dict):
+        """None 为线性，"stepped" 为阶梯，其余为贝塞尔控制点 (c1, c2, c3, c4)"""
+        curve = frame.get("curve")
+        if curve is None or curve == "stepped":
+            return curve
+        if isinstance(curve, list):
+            # 4.x 风格的数组写法
+            return tuple(curve[:4])
+        return (curve, frame.get("c2", 0), frame.get("c3", 1), frame.get("c4", 1))
             
     @staticmethod
     def _parse_color(color_str: str) -> Color:
@@ -0,0 +1,157 @@
+"""多骨架的 LOD 与可见性节流
+
+每帧按屏幕包围盒给骨架分级：
+    full     每帧更新姿态并绘制
+    reduced  屏幕上很小：每 update_interval 帧采样一次姿态，关闭裁剪
+    culled   不在屏幕内：只推进动画时间，不计算姿态也不绘制
+
+分级策略可替换：任何 policy(skeleton, viewport) -> 级别名 的可调用对象都可以。
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from profiler import PROFILER
+from bounds import to_screen
+
+
+@dataclass(frozen=True)
+class LodLevel:
+    name: str
+    update_interval: int  # 每隔几帧采样一次姿态，0 表示只推进时间
+    draw: bool = True
+    clipping: bool = True
+
+
+LOD_LEVELS: Dict[str, LodLevel] = {
+    "full": LodLevel("full", 1),
+    "reduced": LodLevel("reduced", 3, clipping=False),
+    "culled": LodLevel("culled", 0, draw=False, clipping=False),
+}
+
+
+def estimate_screen_bounds(skeleton, viewport) -> Optional[tuple]:
+    """屏幕 AABB (x0, y0, x1, y1)
+
+    当前动画有预计算包围盒（bounds.bake_bounds）时按播放时间查表，被剔除、不计算姿态的骨架也准确；
+    否则用 SkeletonData 的 x/y/width/height 粗估：数据中的包围盒按 setup pose 计算，
+    这里以原点为中心对称放大，宁可多画也不误剔除。没有尺寸信息时返回 None。
+    """
+    player = skeleton.pose_source
+    animation = getattr(player, "animation", None)
+    if animation is not None and animation.bounds is not None:
+        box = animation.bounds.at(player.time, player.loop)
+        return None if box is None else to_screen(box, skeleton.render_settings, viewport)
+
+    data = skeleton.data
+    if not data.width or not data.height:
+        return None
+    extent_x = max(abs(data.x), abs(data.x + data.width))
+    extent_y = max(abs(data.y), abs(data.y + data.height))
+
+    root = skeleton.all_bones[0] if skeleton.all_bones else None
+    origin_x = root.world_x - root.data.x if root else 0.0
+    origin_y = root.world_y - root.data.y if root else 0.0
+
+    settings = skeleton.render_settings
+    scale = settings.scale
+    center_x = viewport[0] // 2 + (origin_x + settings.position_x) * scale
+    center_y = viewport[1] // 2 + (origin_y + settings.position_y) * scale
+    extent_x *= abs(scale)
+    extent_y *= abs(scale)
+    return center_x - extent_x, center_y - extent_y, center_x + extent_x, center_y + extent_y
+
+
+class ScreenSizePolicy:
+    """按屏幕包围盒分级：与视口（含 margin）不相交为 culled，最长边小于 full_size 像素为 reduced"""
+    def __init__(self, full_size: float = 120, margin: float = 32, bounds=estimate_screen_bounds):
+        self.full_size = full_size
+        self.margin = margin
+        self.bounds = bounds
+
+    def __call__(self, skeleton, viewport) -> str:
+        bounds = self.bounds(skeleton, viewport)
+        if bounds is None:
+            return "full"
+        x0, y0, x1, y1 = bounds
+        margin = self.margin
+        if x1 < -margin or y1 < -margin or x0 > viewport[0] + margin or y0 > viewport[1] + margin:
+            return "culled"
+        if max(x1 - x0, y1 - y0) < self.full_size:
+            return "reduced"
+        return "full"
+
+
+class _Entry:
+    __slots__ = ("skeleton", "player", "level", "frames")
+
+    def __init__(self, skeleton, player):
+        self.skeleton = skeleton
+        self.player = player
+        self.level = None
+        self.frames = 0
+
+
+class LodScheduler:
+    """管理一组 (skeleton, AnimationPlayer)，按 LOD 决定每帧的姿态更新与绘制
+
+    counts 为最近一帧各级别的骨架数，同时记入 PROFILER 的 lod.<级别> 计数器。
+    被剔除或降频的骨架同样触发动画事件，每个骨架每帧经 player.flush_events() 交出一批。
+    """
+    def __init__(self, viewport, policy=None, levels: Dict[str, LodLevel] = None):
+        self.viewport = tuple(viewport)
+        self.policy = policy or ScreenSizePolicy()
+        self.levels = levels or LOD_LEVELS
+        self.entries = []
+        self.counts = {name: 0 for name in self.levels}
+
+    def add(self, skeleton, player):
+        self.entries.append(_Entry(skeleton, player))
+
+    def remove(self, skeleton):
+        self.entries = [entry for entry in self.entries if entry.skeleton is not skeleton]
+
+    def _set_level(self, entry: _Entry, level: LodLevel):
+        skeleton = entry.skeleton
+        if skeleton.clipping != level.clipping:
+            skeleton.clipping = level.clipping
+            # 静态图层按裁剪结果合成，需要重建
+            skeleton.static_layers.invalidate()
+        if entry.level is not None and entry.level.update_interval != level.update_interval:
+            entry.frames = 0
+        entry.level = level
+
+    def update(self, dt: float) -> dict:
+        """分级并推进所有骨架，返回本帧各级别的数量"""
+        counts = {name: 0 for name in self.levels}
+        for entry in self.entries:
+            level = self.levels[self.policy(entry.skeleton, self.viewport)]
+            if level is not entry.level:
+                self._set_level(entry, level)
+            counts[level.name] += 1
+
+            interval = level.update_interval
+            player = entry.player
+            if interval <= 0:
+                player.advance_time(dt)
+            elif interval == 1:
+                player.update(dt)
+            else:
+                # 时间（和事件）每帧推进，姿态每 interval 帧采样一次
+                player.advance_time(dt)
+                entry.frames += 1
+                if entry.frames >= interval:
+                    player.update(0.0)
+                    entry.frames = 0
+            player.flush_events()
+
+        self.counts = counts
+        if PROFILER.enabled:
+            for name, count in counts.items():
+                PROFILER.count("lod." + name, count)
+        return counts
+
+    def draw(self, surface):
+        """只绘制未被剔除的骨架"""
+        for entry in self.entries:
+            if entry.level is None or entry.level.draw:
+                entry.skeleton.draw(surface)
@@ -1,105 +1,322 @@
+import os
+import sys
 import pygame
 from runtime import Skeleton, AttachmentType, Slot
 from atlas import Atlas
-from loader import SkeletonJson
+from loader import SkeletonJson, find_characters
+from async_loader import AsyncLoader
 
-from render import AttachmentSprite
+from render import AttachmentSprite, DrawList
+from spatial import PickIndex
+from profiler import PROFILER, perf_counter
+from hud import FrameHUD
+from pipeline import FramePipeline
+from playback import AnimationPlayer
+from textures import TEXTURE_CACHE
+from budget import TEXTURE_BUDGET
 
 from operation import print_all_animation_bones, update_sprites_for_animation
 
-pygame.init()
-screen = pygame.display.set_mode((1280, 720))
-pygame.display.set_caption("Spine")
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("Arial", 16)
-edit_mode = True
-
-atlas = Atlas("/Users/michelleyan/Downloads/skel/xianghe.atlas")
-json_loader = SkeletonJson(atlas)
-skeleton_data = json_loader.read_skeleton_data("/Users/michelleyan/Downloads/skel/xianghe.json")
-skeleton = Skeleton(skeleton_data)
-
-print_all_animation_bones(json_loader)
-
-current_animation_index = 0
-animation_names = [a.name for a in skeleton_data.animations]
-
-sprites = []
-update_sprites_for_animation(animation_names[current_animation_index], skeleton_data, skeleton, json_loader, sprites, AttachmentSprite)
-
-scroll_offset = 0
-
-running = True
-while running:
-    screen_width, screen_height = screen.get_size()
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                edit_mode = not edit_mode
-            elif event.key == pygame.K_TAB:
-                current_animation_index = (current_animation_index + 1) % len(animation_names)
-                update_sprites_for_animation(animation_names[current_animation_index], skeleton_data, skeleton, json_loader, sprites, AttachmentSprite)
-            elif event.key == pygame.K_ESCAPE:
-                pass
-            elif event.key == pygame.K_q:
-                skeleton.render_settings.scale *= 1.1
-            elif event.key == pygame.K_a:
-                skeleton.render_settings.scale /= 1.1
-
-            elif event.key == pygame.K_LEFT:
-                skeleton.render_settings.position_x -= 10
-            elif event.key == pygame.K_RIGHT:
-                skeleton.render_settings.position_x += 10
-            elif event.key == pygame.K_UP:
-                skeleton.render_settings.position_y -= 10
-            elif event.key == pygame.K_DOWN:
-                skeleton.render_settings.position_y += 10
-
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:
-                pass
-            # 移除中键拖动相关代码
-            elif event.button == 4:
-                scroll_offset = min(scroll_offset + 20, 0)
-            elif event.button == 5:
-                scroll_offset -= 20
-
-        elif event.type == pygame.MOUSEBUTTONUP:
-            pass  
-
-        elif event.type == pygame.MOUSEMOTION:
-            pass 
-
-    screen.fill((245, 245, 255))
-    skeleton.update_world_transform()
-
-    for i, sprite in enumerate(sprites):
-        if not sprite.dragging and not sprite.bound_bone:
-            sprite.rect.x = screen_width - 150
-            sprite.rect.y = 100 + i * 100 + scroll_offset
-        sprite.update(screen, skeleton)
+DEFAULT_SKEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skel")
 
+
+def prepare_frame(job):
+    """流水线的准备阶段：计算世界变换并生成绘制列表（变换/染色后的贴图），不接触屏幕
+
+    返回 (skeleton, PreparedFrame, 有附件的插槽骨骼的屏幕坐标 [(name, x, y)])。
+    """
+    skeleton, (screen_width, screen_height) = job
+    frame = skeleton.prepare_frame((screen_width, screen_height))
+    settings = skeleton.render_settings
+    points = []
     for slot in skeleton.slots:
         if slot.attachment:
             bone = slot.bone
-            cx = screen_width // 2 + (bone.world_x + skeleton.render_settings.position_x) * skeleton.render_settings.scale
-            cy = screen_height // 2 + (bone.world_y + skeleton.render_settings.position_y) * skeleton.render_settings.scale
+            cx = screen_width // 2 + (bone.world_x + settings.position_x) * settings.scale
+            cy = screen_height // 2 + (bone.world_y + settings.position_y) * settings.scale
+            points.append((bone.data.name, cx, cy))
+    return skeleton, frame, points
+
+
+def pick_label(pick_index: PickIndex, x: float, y: float) -> str:
+    """优先拾取骨骼，其次是附件"""
+    picked = pick_index.pick_bone(x, y, 8)
+    if picked:
+        return f"bone: {picked[1].data.name}"
+    picked = pick_index.pick_attachment(x, y)
+    return f"attachment: {picked[2].name}" if picked else ""
+
+
+def check_picking(atlas_path: str, json_path: str, size=(1280, 720)) -> list:
+    """无头检查附件拾取：按查看器的流程准备并提交一帧，点击每个未被遮挡的附件应拾取到它本身
+
+    返回失败列表 [(附件名, 点击位置, 拾取到的附件名)]；一个可点击的附件都没有时也算失败。
+    """
+    atlas = Atlas(atlas_path)
+    skeleton = Skeleton(SkeletonJson(atlas).read_skeleton_data(json_path))
+    pick_index = PickIndex(size)
+    skeleton.pick_index = pick_index
+    frame_skeleton, prepared, _ = prepare_frame((skeleton, size))
+    frame_skeleton.present_frame(pygame.Surface(size, pygame.SRCALPHA), prepared)
+
+    rects = [(attachment, rect) for _, attachment, rect, _, _ in prepared.hit_items]
+    failures = []
+    checked = 0
+    for i, (attachment, rect) in enumerate(rects):
+        # 在矩形内找一个不被后绘制（上层）附件覆盖的点
+        later = [other for _, other in rects[i + 1:]]
+        point = next(((x, y)
+                      for y in range(rect.top, rect.bottom, max(1, rect.height // 8))
+                      for x in range(rect.left, rect.right, max(1, rect.width // 8))
+                      if not any(other.collidepoint(x, y) for other in later)), None)
+        if point is None:
+            continue
+        checked += 1
+        picked = pick_index.pick_attachment(*point)
+        if picked is None or picked[2] is not attachment:
+            failures.append((attachment.name, point, picked[2].name if picked else None))
+    if checked == 0:
+        failures.append((None, None, None))
+    return failures
+
+
+def run_viewer(atlas_path: str, json_path: str, size=(1280, 720), pipelined: bool = True):
+    """交互式查看器（需要显示设备）
+
+    pipelined 时下一帧的姿态与绘制列表在工作线程上准备，与本帧的 blit / flip 重叠，画面延迟一帧。
+    """
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption("Spine")
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont("Arial", 16)
+    edit_mode = True
+
+    atlas = Atlas(atlas_path)
+    json_loader = SkeletonJson(atlas)
+    skeleton_data = json_loader.read_skeleton_data(json_path)
+    skeleton = Skeleton(skeleton_data)
+    pick_index = PickIndex(screen.get_size())
+    skeleton.pick_index = pick_index
+
+    print_all_animation_bones(json_loader)
+
+    current_animation_index = 0
+    animation_names = [a.name for a in skeleton_data.animations]
+
+    sprites = []
+    update_sprites_for_animation(animation_names[current_animation_index], skeleton_data, skeleton, json_loader, sprites, AttachmentSprite)
+
+    # 姿态按 SkeletonData.fps 固定步长更新，渲染时插值
+    player = AnimationPlayer(skeleton)
+    player.set_animation(skeleton_data.animations[current_animation_index])
+    skeleton.pose_source = player
+    frame_dt = 0.0
+
+    scroll_offset = 0
+    frame_draw_list = DrawList()
+    picked_label = ""
+    event_label = ""
+
+    hud = FrameHUD(font, target_fps=60)
+    hud.add_cache("surfaces", skeleton.surface_cache)
+    hud.add_cache("tints", skeleton.tint_cache)
+    hud.add_cache("static layers", skeleton.static_layers)
+    hud.add_cache("hud text", hud.text_cache)
+    hud.add_cache("atlas pages", TEXTURE_CACHE)
+    TEXTURE_BUDGET.track(skeleton)
+
+    # N 键在后台加载同目录下的下一个角色，加载完成后再切换
+    characters = find_characters(os.path.dirname(os.path.abspath(json_path)))
+    character_index = next((i for i, c in enumerate(characters)
+                            if os.path.samefile(c[2], json_path)), 0)
+    async_loader = AsyncLoader()
+    loading = None
+
+    pipeline = FramePipeline(prepare_frame, enabled=pipelined)
+    pipeline.submit((skeleton, screen.get_size()))
+
+    running = True
+    while running:
+        profiling = PROFILER.enabled
+        if profiling:
+            phase_start = perf_counter()
+
+        # 取回上一轮准备好的帧；此后到 submit 之前工作线程空闲，可以安全修改骨架
+        frame_skeleton, prepared, bone_points = pipeline.wait()
+
+        screen_width, screen_height = screen.get_size()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    edit_mode = not edit_mode
+                elif event.key == pygame.K_TAB:
+                    current_animation_index = (current_animation_index + 1) % len(animation_names)
+                    update_sprites_for_animation(animation_names[current_animation_index], skeleton_data, skeleton, json_loader, sprites, AttachmentSprite)
+                    player.set_animation(skeleton_data.animations[current_animation_index])
+                    event_label = ""
+                    # 切换动画后换出新动画用不到的页面
+                    TEXTURE_BUDGET.enforce()
+                elif event.key == pygame.K_ESCAPE:
+                    pass
+                elif event.key == pygame.K_n and characters and loading is None:
+                    character_index = (character_index + 1) % len(characters)
+                    _, next_atlas, next_json = characters[character_index]
+                    loading = async_loader.load(next_atlas, next_json)
+                elif event.key == pygame.K_p:
+                    # 开关逐阶段计时
+                    PROFILER.enable(not PROFILER.enabled)
+                elif event.key == pygame.K_o:
+                    PROFILER.dump_csv("spinal_profile.csv")
+                elif event.key == pygame.K_h:
+                    # 帧时间叠加层，显示时自动开启 PROFILER
+                    hud.toggle()
+                elif event.key == pygame.K_q:
+                    skeleton.render_settings.scale *= 1.1
+                elif event.key == pygame.K_a:
+                    skeleton.render_settings.scale /= 1.1
+
+                elif event.key == pygame.K_LEFT:
+                    skeleton.render_settings.position_x -= 10
+                elif event.key == pygame.K_RIGHT:
+                    skeleton.render_settings.position_x += 10
+                elif event.key == pygame.K_UP:
+                    skeleton.render_settings.position_y -= 10
+                elif event.key == pygame.K_DOWN:
+                    skeleton.render_settings.position_y += 10
+
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:
+                    picked_label = pick_label(pick_index, event.pos[0], event.pos[1])
+                # 移除中键拖动相关代码
+                elif event.button == 4:
+                    scroll_offset = min(scroll_offset + 20, 0)
+                elif event.button == 5:
+                    scroll_offset -= 20
+
+            elif event.type == pygame.MOUSEBUTTONUP:
+                pass  
+
+            elif event.type == pygame.MOUSEMOTION:
+                pass 
+
+        # 主线程收尾（convert_alpha）限制在 2ms 内
+        for handle in async_loader.poll(0.002):
+            loading = None
+            if handle.error is not None:
+                print(f"加载失败: {handle.json_path}: {handle.error}")
+                continue
+            # 注销旧骨架：拾取索引中的骨骼与附件、HUD 中的缓存
+            TEXTURE_BUDGET.untrack(skeleton)
+            pick_index.remove_skeleton(skeleton)
+            hud.remove_caches(skeleton.surface_cache, skeleton.tint_cache, skeleton.static_layers)
+            atlas, json_loader, skeleton_data = handle.result()
+            settings = skeleton.render_settings
+            skeleton = Skeleton(skeleton_data)
+            skeleton.render_settings = settings
+            skeleton.pick_index = pick_index
+            current_animation_index = 0
+            animation_names = [a.name for a in skeleton_data.animations]
+            update_sprites_for_animation(animation_names[current_animation_index], skeleton_data, skeleton, json_loader, sprites, AttachmentSprite)
+            player = AnimationPlayer(skeleton)
+            player.set_animation(skeleton_data.animations[current_animation_index])
+            skeleton.pose_source = player
+            hud.add_cache("surfaces", skeleton.surface_cache)
+            hud.add_cache("tints", skeleton.tint_cache)
+            hud.add_cache("static layers", skeleton.static_layers)
+            TEXTURE_BUDGET.track(skeleton)
+            TEXTURE_BUDGET.enforce()
+
+        if profiling:
+            now = perf_counter()
+            PROFILER.add("main.events", now - phase_start)
+            phase_start = now
+
+        screen.fill((245, 245, 255))
+        # 固定步长推进动画；插值在准备阶段（pose_source）完成
+        player.update(frame_dt)
+        fired = player.flush_events()
+        if fired:
+            event_label = "event: " + ", ".join(event.name for event in fired)
+
+        for i, sprite in enumerate(sprites):
+            if not sprite.dragging and not sprite.bound_bone:
+                sprite.rect.x = screen_width - 150
+                sprite.rect.y = 100 + i * 100 + scroll_offset
+            sprite.update(screen, skeleton)
+
+        # 开始准备下一帧，与下面的绘制和 flip 重叠
+        pipeline.submit((skeleton, (screen_width, screen_height)))
+
+        if profiling:
+            now = perf_counter()
+            PROFILER.add("main.update", now - phase_start)
+            phase_start = now
+
+        # 提交上一轮准备好的帧，同时发布命中检测与拾取数据；
+        # 切换骨架后的第一帧仍属于旧骨架，不再提交，以免旧附件重新登记到拾取索引
+        if frame_skeleton is skeleton:
+            frame_skeleton.present_frame(screen, prepared)
+
+        for name, cx, cy in bone_points:
             pygame.draw.circle(screen, (255, 0, 0), (int(cx), int(cy)), 4)
-            label = font.render(bone.data.name, True, (0, 0, 255))
-            screen.blit(label, (cx + 6, cy - 6))
+            label = font.render(name, True, (0, 0, 255))
+            frame_draw_list.add(label, (cx + 6, cy - 6))
+
+        for sprite in sprites:
+            sprite.draw(screen, font, frame_draw_list)
+
+        mode_label = font.render("Tab，Space，N，ESC", True, (0, 0, 0))
+        frame_draw_list.add(mode_label, (10, 10))
+
+        anim_label = font.render(f"current: {animation_names[current_animation_index]}", True, (0, 0, 0))
+        frame_draw_list.add(anim_label, (10, 40))
+
+        # 上一帧提交的绘制调用数
+        stats_label = font.render(f"draw calls: {frame_draw_list.draw_calls}  blits: {frame_draw_list.blit_count}", True, (0, 0, 0))
+        frame_draw_list.add(stats_label, (10, 70))
+
+        if loading is not None:
+            loading_label = f"loading {os.path.basename(loading.json_path)}: {loading.stage} {loading.progress:.0%}"
+            frame_draw_list.add(font.render(loading_label, True, (0, 0, 0)), (10, screen_height - 30))
+
+        if picked_label:
+            frame_draw_list.add(font.render(picked_label, True, (0, 0, 0)), (10, 100))
+
+        if event_label:
+            frame_draw_list.add(font.render(event_label, True, (0, 0, 0)), (10, 130))
+
+        hud.draw(frame_draw_list)
+
+        if profiling:
+            now = perf_counter()
+            PROFILER.add("main.labels", now - phase_start)
+            phase_start = now
+
+        frame_draw_list.submit(screen)
+
+        if profiling:
+            now = perf_counter()
+            PROFILER.add("main.blit", now - phase_start)
+            phase_start = now
+
+        pygame.display.flip()
 
-    for sprite in sprites:
-        sprite.draw(screen, font)
+        if profiling:
+            PROFILER.add("main.flip", perf_counter() - phase_start)
+        PROFILER.end_frame()
 
-    mode_label = font.render("Tab，Space，ESC", True, (0, 0, 0))
-    screen.blit(mode_label, (10, 10))
+        frame_dt = clock.tick(60) / 1000.0
 
-    anim_label = font.render(f"current: {animation_names[current_animation_index]}", True, (0, 0, 0))
-    screen.blit(anim_label, (10, 40))
+    pipeline.close()
+    async_loader.shutdown()
+    pygame.quit()
 
-    pygame.display.flip()
-    clock.tick(60)
 
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    # python main.py [skeleton.json [skeleton.atlas]]
+    json_arg = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DEFAULT_SKEL_DIR, "xianghe.json")
+    atlas_arg = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(json_arg)[0] + ".atlas"
+    run_viewer(atlas_arg, json_arg)
@@ -0,0 +1,232 @@
+"""SkeletonData / Atlas / 运行时缓存的内存占用报告
+
+    python memory.py ../skel/xianghe.json
+    python memory.py ../skel/xianghe.json --atlas ../skel/xianghe.atlas --textures --skeleton
+"""
+import os
+import sys
+import enum
+import types
+import argparse
+
+# 共享的类型对象和函数不计入任何类别
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+               types.MethodType, enum.Enum)
+
+
+def _surface_types() -> tuple:
+    """pygame 的 Surface / Mask 类型；纯数据模式下没有导入 pygame，也就不会有 Surface"""
+    pygame = sys.modules.get("pygame")
+    if pygame is None:
+        return ()
+    return (pygame.Surface, pygame.mask.Mask)
+
+
+def surface_bytes(surface) -> int:
+    """Surface 自身持有的像素字节数；subsurface 与父 Surface 共享像素，记为 0"""
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def mask_bytes(mask) -> int:
+    """pygame.mask.Mask 按位存储，近似为 w * h / 8"""
+    width, height = mask.get_size()
+    return (width * height + 7) // 8
+
+
+class SizeCounter:
+    """sys.getsizeof 深度遍历，跨类别共享 seen 集合，保证同一对象只计一次
+
+    遇到 Surface / Mask 时只记录对象头，像素字节交给调用方单独统计。
+    """
+    def __init__(self):
+        self.seen = set()
+
+    def sizeof(self, *roots) -> int:
+        total = 0
+        stack = list(roots)
+        seen = self.seen
+        leaf_types = (str, bytes, int, float, bool) + _surface_types()
+        while stack:
+            obj = stack.pop()
+            if obj is None or isinstance(obj, _SKIP_TYPES):
+                continue
+            oid = id(obj)
+            if oid in seen:
+                continue
+            seen.add(oid)
+            total += sys.getsizeof(obj)
+
+            if isinstance(obj, leaf_types):
+                continue
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+            else:
+                attrs = getattr(obj, "__dict__", None)
+                if attrs is not None:
+                    stack.append(attrs)
+                for name in getattr(type(obj), "__slots__", ()):
+                    stack.append(getattr(obj, name, None))
+        return total
+
+
+def _collect_surfaces(roots) -> list:
+    """在对象图里找出所有 Surface（不进入 Surface 内部）"""
+    surface_types = _surface_types()
+    if not surface_types:
+        return []
+    found = {}
+    seen = set()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if obj is None or isinstance(obj, _SKIP_TYPES) or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, surface_types[0]):
+            found[id(obj)] = obj
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+    return list(found.values())
+
+
+def _atlas_report(counter: SizeCounter, atlas, report: dict):
+    """只统计已经解码的页面和已经切出的区域（不触发加载）"""
+    pages = {id(page.texture): page.texture for page in atlas.pages if page.texture is not None}
+    copies = {}
+    for region in atlas.regions.values():
+        texture = region.loaded_texture
+        if texture is None:
+            continue
+        parent = texture.get_parent()
+        if parent is not None:
+            # 区域是页面的 subsurface，像素归页面所有
+            while parent.get_parent() is not None:
+                parent = parent.get_parent()
+            pages[id(parent)] = parent
+        else:
+            # 旋转区域是独立拷贝
+            copies[id(texture)] = texture
+
+    report["atlas_regions"] = counter.sizeof(atlas)
+    report["atlas_pages"] = sum(surface_bytes(page) for page in pages.values())
+    report["atlas_region_copies"] = sum(surface_bytes(copy) for copy in copies.values())
+    return len(pages), len(copies)
+
+
+def _cache_report(counter: SizeCounter, skeleton, report: dict):
+    cache = skeleton.surface_cache
+    surfaces = list(cache.surfaces.values())
+    masks = list(cache.masks.values())
+    layers = [layer for layer, _ in skeleton.static_layers.all_runs() if layer is not None]
+    layer_surfaces = [layer.surface for layer in layers]
+
+    # 对象图本身（dict/元组/StaticLayer 等）
+    report["skeleton_runtime"] = counter.sizeof(skeleton.all_bones, skeleton.slots, skeleton._frames,
+                                                skeleton._draw_items, skeleton._clips, skeleton._hit_items,
+                                                skeleton._bounding_boxes, skeleton.render_settings)
+    report["surface_cache"] = (counter.sizeof(cache)
+                               + sum(surface_bytes(surface) for surface in surfaces)
+                               + sum(mask_bytes(mask) for mask in masks))
+    report["static_layers"] = (counter.sizeof(skeleton.static_layers)
+                               + sum(surface_bytes(surface) for surface in layer_surfaces))
+    tints = skeleton.tint_cache
+    report["tint_cache"] = (counter.sizeof(tints)
+                            + sum(surface_bytes(surface) for surface in tints.surfaces.values()))
+
+
+def memory_report(skeleton_data=None, atlas=None, skeletons=(), json_loader=None) -> dict:
+    """按类别统计字节数，返回 {category: bytes}，另含 total
+
+    类别按顺序统计，共享对象只计入第一个引用它的类别：
+    atlas、bones、slots、skins/attachments、animations、各骨架运行时缓存、loader 原始 JSON。
+    """
+    counter = SizeCounter()
+    report = {}
+
+    if atlas is not None:
+        # 先把 Surface 对象头计入 atlas，避免附件引用的 region 被算进 skins
+        _atlas_report(counter, atlas, report)
+
+    if skeleton_data is not None:
+        report["bones"] = counter.sizeof(skeleton_data.bones)
+        report["slots"] = counter.sizeof(skeleton_data.slots)
+        report["skins_attachments"] = counter.sizeof(skeleton_data.skins, skeleton_data.default_skin)
+        report["animations"] = counter.sizeof(skeleton_data.animations)
+        report["skeleton_data_other"] = counter.sizeof(skeleton_data)
+
+        # 没有传 atlas 时，附件引用到的贴图也要计入
+        if atlas is None:
+            surfaces = _collect_surfaces([skeleton_data.skins, skeleton_data.default_skin])
+            report["attachment_textures"] = sum(surface_bytes(surface) for surface in surfaces)
+
+    for i, skeleton in enumerate(skeletons):
+        part = {}
+        _cache_report(counter, skeleton, part)
+        suffix = f"[{i}]" if len(skeletons) > 1 else ""
+        for key, value in part.items():
+            report[key + suffix] = value
+
+    if json_loader is not None and json_loader.raw is not None:
+        report["loader_raw_json"] = counter.sizeof(json_loader.raw)
+
+    report["total"] = sum(report.values())
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = []
+    total = report.get("total", 0) or 1
+    for key, value in report.items():
+        if key == "total":
+            continue
+        lines.append(f"{key:24s} {value / 1024 / 1024:10.3f} MB  {value / total * 100:5.1f}%")
+    lines.append(f"{'total':24s} {report.get('total', 0) / 1024 / 1024:10.3f} MB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="spinALrcp memory report")
+    parser.add_argument("json", help="骨架 .json 路径")
+    parser.add_argument("--atlas", help=".atlas 路径，缺省为同名文件")
+    parser.add_argument("--textures", action="store_true", help="解码全部图集页面后再统计")
+    parser.add_argument("--skeleton", action="store_true", help="同时创建 Skeleton 并绘制一帧，统计运行时缓存")
+    args = parser.parse_args(argv)
+
+    # 延迟导入，避免 import memory 时就加载整个运行时
+    from atlas import Atlas
+    from loader import SkeletonJson
+
+    atlas_path = args.atlas or os.path.splitext(args.json)[0] + ".atlas"
+
+    atlas = Atlas(atlas_path)
+    json_loader = SkeletonJson(atlas)
+    skeleton_data = json_loader.read_skeleton_data(args.json)
+
+    if args.textures:
+        from textures import load_atlas_textures
+        load_atlas_textures(atlas)
+
+    skeletons = []
+    if args.skeleton:
+        import pygame
+        from runtime import Skeleton
+        skeleton = Skeleton(skeleton_data)
+        skeleton.draw(pygame.Surface((1280, 720)))
+        skeletons.append(skeleton)
+
+    report = memory_report(skeleton_data, atlas, skeletons, json_loader)
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ class SpineRenderSettings:
     position_y: float = 0.0               # Y位置偏移
     flip_x: bool = False                  # X轴翻转
     flip_y: bool = False  
+    debug_points: bool = True             # 提交帧时绘制附件中心的调试红点
 
 # 枚举定义
 class BlendMode(IntEnum):
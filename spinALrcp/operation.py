@@ -11,14 +11,48 @@ def print_all_animation_bones(json_loader):
 def get_attachment_names_for_animation(animation):
     names = set()
     for slot_timeline in animation.slot_timelines:
-        for keyframe in slot_timeline.timelines:
-            if keyframe["name"]:
-                names.add(keyframe["name"])
+        names.update(name for name in slot_timeline.names if name)
     return names
 
 def get_slot_names_for_animation(animation):
     return set(slot_timeline.slot_name for slot_timeline in animation.slot_timelines)
 
+# 骨骼时间轴的中性值（与 setup pose 相同）
+BONE_TIMELINE_IDENTITY = {
+    "rotate": {"angle": 0},
+    "translate": {"x": 0, "y": 0},
+    "scale": {"x": 1, "y": 1},
+    "shear": {"x": 0, "y": 0},
+}
+
+def get_moving_bone_names(anim_raw):
+    """返回关键帧确实改变了姿态的骨骼（导出时全量 key 的中性帧不算）"""
+    names = set()
+    for bone_name, timelines in anim_raw.get("bones", {}).items():
+        for timeline_name, frames in timelines.items():
+            identity = BONE_TIMELINE_IDENTITY.get(timeline_name)
+            if identity is None:
+                names.add(bone_name)
+                break
+            if any(abs(frame.get(key, value) - value) > 1e-6
+                   for frame in frames for key, value in identity.items()):
+                names.add(bone_name)
+                break
+    return names
+
+def get_changing_slot_names(animation, skeleton_data):
+    """返回附件关键帧与 setup 附件不同、或有颜色关键帧的插槽"""
+    setup_names = {slot.name: slot.attachment_name for slot in skeleton_data.slots}
+    names = set()
+    for slot_timeline in animation.slot_timelines:
+        setup_name = setup_names.get(slot_timeline.slot_name)
+        if any(name != setup_name for name in slot_timeline.names):
+            names.add(slot_timeline.slot_name)
+    if animation.color_timelines is not None:
+        for slot_index in animation.color_timelines.slot_indices.tolist():
+            names.add(skeleton_data.slots[slot_index].name)
+    return names
+
 def update_sprites_for_animation(animation_name, skeleton_data, skeleton, json_loader, sprites, AttachmentSprite):
 
     # for sprite in sprites:
@@ -67,4 +101,9 @@ def update_sprites_for_animation(animation_name, skeleton_data, skeleton, json_l
         include_parents(name, bone_data_map, used_bone_names)
 
     skeleton.reset_bones_from_names(used_bone_names)
+    skeleton.set_animated_parts(
+        animation_name,
+        get_moving_bone_names(anim_raw),
+        get_changing_slot_names(animation, skeleton_data)
+    )
     skeleton.update_world_transform()
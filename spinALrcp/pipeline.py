@@ -0,0 +1,100 @@
+"""两级帧流水线：工作线程准备第 N+1 帧，主线程同时提交第 N 帧
+
+    pipeline = FramePipeline(prepare)   # prepare(job) -> frame，在工作线程执行
+    pipeline.submit(job_0)
+    while running:
+        frame = pipeline.wait()         # 第 N 帧准备完毕，工作线程空闲
+        ...                             # 处理输入、修改骨架（此时安全）
+        pipeline.submit(job_next)       # 开始准备第 N+1 帧
+        present(frame)                  # blit / flip 期间 SDL 释放 GIL，与准备重叠
+
+submit 与 wait 严格交替，帧按提交顺序交接，延迟固定为一帧。
+enabled=False 时在 submit 内同步执行，便于对比与调试。
+"""
+import threading
+
+from profiler import PROFILER, perf_counter
+
+
+class FramePipeline:
+    def __init__(self, prepare, enabled: bool = True, name: str = "spinal-prepare"):
+        self.prepare = prepare
+        self.enabled = enabled
+        self.frames = 0
+        self._job = None
+        self._result = None
+        self._error = None
+        self._pending = False
+        self._closed = False
+        self._start = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+        if enabled:
+            self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._start.wait()
+            self._start.clear()
+            if self._closed:
+                return
+            try:
+                self._result = self.prepare(self._job)
+            except BaseException as error:
+                self._error = error
+            self._job = None
+            self._done.set()
+
+    def submit(self, job=None):
+        """开始准备下一帧；上一帧必须已经 wait()"""
+        if self._pending:
+            raise RuntimeError("上一帧还没有 wait()")
+        if self._closed:
+            raise RuntimeError("流水线已关闭")
+        self._pending = True
+        if not self.enabled:
+            try:
+                self._result = self.prepare(job)
+            except BaseException as error:
+                self._error = error
+            return
+        self._job = job
+        self._done.clear()
+        self._start.set()
+
+    def wait(self):
+        """等待已提交的帧准备完毕并返回它；工作线程中的异常在这里重新抛出"""
+        if not self._pending:
+            raise RuntimeError("没有已提交的帧")
+        if self.enabled:
+            profiling = PROFILER.enabled
+            if profiling:
+                start = perf_counter()
+            self._done.wait()
+            if profiling:
+                # 主线程等待工作线程的时间，流水线平衡时接近 0
+                PROFILER.add("pipeline.wait", perf_counter() - start)
+        self._pending = False
+        self.frames += 1
+        result, error = self._result, self._error
+        self._result = self._error = None
+        if error is not None:
+            raise error
+        return result
+
+    @property
+    def pending(self) -> bool:
+        return self._pending
+
+    def close(self):
+        if self._pending:
+            try:
+                self.wait()
+            except Exception:
+                pass
+        self._closed = True
+        if self._thread is not None:
+            self._start.set()
+            self._thread.join()
+            self._thread = None
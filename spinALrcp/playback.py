@@ -0,0 +1,154 @@
+"""动画播放：固定步长采样姿态，渲染时在最近两次姿态之间插值
+
+姿态按 SkeletonData.fps（缺省 30Hz）更新，渲染帧率更高时只做插值，
+单帧变慢时最多补 max_steps 步，多余的时间直接丢弃，不会出现追帧尖峰。
+动画事件在 update / advance_time 中收集，每帧由 flush_events() 一次性交出。
+不依赖 pygame。
+"""
+from typing import Optional
+
+import numpy as np
+
+from animation import apply_animation, fired_events
+from skeleton_data import Animation
+from profiler import PROFILER
+
+NO_EVENTS = ()
+
+
+class FixedTimestep:
+    """固定步长累加器"""
+    def __init__(self, rate: float = 30.0, max_steps: int = 4):
+        self.step = 1.0 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped = 0.0  # 因超过 max_steps 丢弃的时间（秒）
+
+    def advance(self, dt: float) -> int:
+        """累加 dt，返回本帧需要执行的步数"""
+        self.accumulator += max(dt, 0.0)
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            self.dropped += (steps - self.max_steps) * self.step
+            self.accumulator -= (steps - self.max_steps) * self.step
+            steps = self.max_steps
+        self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """距上一步的时间占步长的比例，0..1"""
+        return min(self.accumulator / self.step, 1.0)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+class AnimationPlayer:
+    """以固定频率推进动画；作为 Skeleton.pose_source 时在两次姿态之间线性插值世界矩阵
+
+    插值直接作用在 a/b/c/d/x/y 上，步长很短时与按角度插值的差别可以忽略。
+    listener(skeleton, events) 每帧最多调用一次，events 为本帧触发的全部事件。
+    """
+    def __init__(self, skeleton, rate: Optional[float] = None, max_steps: int = 4):
+        self.skeleton = skeleton
+        self.timestep = FixedTimestep(rate or skeleton.data.fps or 30, max_steps)
+        self.animation: Optional[Animation] = None
+        self.loop = True
+        self.time = 0.0
+        self.speed = 1.0
+        self.paused = False
+        self.steps = 0
+        self._stale = False
+        self.listener = None
+        self.events = NO_EVENTS  # 最近一次 flush_events() 交出的事件
+        self._events = []
+        self._event_time = None  # 已收集到的播放时间，None 表示从头开始
+
+        self._previous = self._capture()
+        self._current = self._previous.copy()
+        self._blend = np.empty_like(self._current)
+
+    def _capture(self) -> np.ndarray:
+        return np.array([(bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y)
+                         for bone in self.skeleton.all_bones], dtype=np.float64)
+
+    def _evaluate(self):
+        """在 self.time 采样动画并更新世界变换（不经过 pose_source）"""
+        skeleton = self.skeleton
+        if self.animation is not None:
+            apply_animation(skeleton, self.animation, self.time, self.loop)
+        for bone in skeleton.bones:
+            if bone.active:
+                bone.update_world_transform()
+        self._previous, self._current = self._current, self._previous
+        self._current[:] = self._capture()
+
+    def set_animation(self, animation: Optional[Animation], loop: bool = True):
+        """切换动画并从头播放；新旧动画之间不插值"""
+        self.animation = animation
+        self.loop = loop
+        self.time = 0.0
+        self._event_time = None
+        self.timestep.reset()
+        self._evaluate()
+        self._previous[:] = self._current
+
+    def advance_time(self, dt: float):
+        """只推进时间不计算姿态（LOD 剔除时使用），下次 update 时直接采样最新时刻"""
+        if not self.paused:
+            self.time += dt * self.speed
+            self._stale = True
+            self._collect_events()
+
+    def _collect_events(self):
+        """收集 (上次收集时间, time] 内的事件"""
+        animation = self.animation
+        if animation is not None and animation.event_timeline is not None:
+            fired_events(animation.event_timeline, self._event_time, self.time,
+                         animation.duration, self.loop, self._events)
+        self._event_time = self.time
+
+    def flush_events(self):
+        """交出本帧收集到的事件并通知 listener；没有事件时返回空元组"""
+        events = self._events
+        if not events:
+            self.events = NO_EVENTS
+            return NO_EVENTS
+        self._events = []
+        self.events = events
+        if PROFILER.enabled:
+            PROFILER.count("events", len(events))
+        if self.listener is not None:
+            self.listener(self.skeleton, events)
+        return events
+
+    def update(self, dt: float) -> int:
+        """推进 dt 秒，返回本帧执行的姿态更新次数"""
+        if self.paused:
+            return 0
+        steps = self.timestep.advance(dt * self.speed)
+        if self._stale:
+            # 跳过的时间不再补步：直接采样最新时刻，也不和旧姿态插值
+            self._stale = False
+            self.time += steps * self.timestep.step
+            self._evaluate()
+            self._previous[:] = self._current
+            self.steps += 1
+            self._collect_events()
+            return 1
+        for _ in range(steps):
+            self.time += self.timestep.step
+            self._evaluate()
+        self.steps += steps
+        self._collect_events()
+        return steps
+
+    def apply(self, skeleton):
+        """把插值后的姿态写入骨骼世界矩阵"""
+        blend = self._blend
+        np.subtract(self._current, self._previous, out=blend)
+        blend *= self.timestep.alpha
+        blend += self._previous
+        for bone, (a, b, c, d, x, y) in zip(skeleton.all_bones, blend.tolist()):
+            bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y = a, b, c, d, x, y
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from typing import Optional
+import math
+
+import numpy as np
+
+from skeleton_data import BoneData, SlotData, Attachment, Skin, SkeletonData
+from mytypes import Color
+from colors import pack_colors
+
+
+@dataclass
+class Bone:
+    """骨骼实例，所有坐标系相关的变换都在这里处理"""
+    data: 'BoneData'  # 需要定义在前面
+    parent: Optional['Bone'] = None
+    
+    # 本地变换属性
+    x: float = 0
+    y: float = 0
+    rotation: float = 0
+    scaleX: float = 1
+    scaleY: float = 1
+    shearX: float = 0
+    shearY: float = 0
+    
+    # 激活状态
+    active: bool = True
+    
+    # 世界变换矩阵
+    a: float = 1  # scale * cos
+    b: float = 0  # scale * sin
+    c: float = 0  # -sin * scale
+    d: float = 1  # cos * scale
+    world_x: float = 0
+    world_y: float = 0
+    
+    def __post_init__(self):
+        """初始化完成后设置初始状态"""
+        self.x = self.data.x
+        self.y = self.data.y
+        self.rotation = self.data.rotation
+        self.scaleX = self.data.scaleX
+        self.scaleY = self.data.scaleY
+        self.shearX = self.data.shearX
+        self.shearY = self.data.shearY
+        self.update_world_transform()
+    
+    def update_world_transform(self):
+        """更新世界变换 - 基于Spine v38的实现"""
+        rotation = math.radians(self.rotation)
+        cos = math.cos(rotation)
+        sin = math.sin(rotation)
+        
+        # 本地变换矩阵
+        self.a = cos * self.scaleX
+        self.b = sin * self.scaleX
+        self.c = -sin * self.scaleY
+        self.d = cos * self.scaleY
+        
+        if self.parent:
+            # 组合父骨骼变换
+            pa = self.parent.a
+            pb = self.parent.b
+            pc = self.parent.c
+            pd = self.parent.d
+            
+            # 计算世界坐标
+            self.world_x = self.x * pa + self.y * pb + self.parent.world_x
+            self.world_y = self.x * pc + self.y * pd + self.parent.world_y
+            
+            # 合并变换矩阵
+            temp_a = self.a
+            temp_b = self.b
+            temp_c = self.c
+            temp_d = self.d
+            
+            self.a = temp_a * pa + temp_b * pc
+            self.b = temp_a * pb + temp_b * pd
+            self.c = temp_c * pa + temp_d * pc
+            self.d = temp_c * pb + temp_d * pd
+        else:
+            # 没有父骨骼，直接使用本地坐标
+            self.world_x = self.x
+            self.world_y = self.y
+
+class Slot:
+    """插槽实例"""
+    def __init__(self, data: SlotData, bone: 'Bone'):
+        self.data = data
+        self.bone = bone
+        self.color = Color(*data.color.__dict__.values())
+        self.attachment: Optional[Attachment] = None
+        self.attachment_time = 0
+        self.blend_mode = data.blend_mode  # 使用枚举
+        
+        # 颜色分量
+        self.r = 1.0
+        self.g = 1.0
+        self.b = 1.0
+        self.a = 1.0
+
+    def set_attachment(self, attachment: Optional[Attachment]):
+        """设置附件"""
+        self.attachment = attachment
+        self.attachment_time = 0
+
+
+class SkeletonPose:
+    """纯数据的骨架姿态：骨骼、插槽与皮肤，不依赖 pygame，供无头姿态计算使用"""
+    def __init__(self, data: SkeletonData):
+        self.data = data
+        self.all_bones = []
+        self.bones = []
+        self.slots = []
+        self.skin = None
+        # 当前绘制顺序：SkeletonData.slots 下标的完整排列，动画的绘制顺序关键帧直接替换它
+        self.setup_draw_order = tuple(range(len(data.slots)))
+        self.draw_order = self.setup_draw_order
+        # 插槽颜色按 SkeletonData.slots 下标打包：(S, 4) RGBA 与双色的 (S, 3) 暗部 RGB
+        self.setup_slot_colors = pack_colors([slot_data.color for slot_data in data.slots])
+        self.setup_dark_colors = pack_colors([slot_data.dark_color or Color(0, 0, 0, 1)
+                                              for slot_data in data.slots])[:, :3].copy()
+        self.two_color = np.array([slot_data.dark_color is not None for slot_data in data.slots], dtype=bool)
+        self.slot_colors = self.setup_slot_colors.copy()
+        self.slot_dark_colors = self.setup_dark_colors.copy()
+
+        # 初始化骨骼 - 确保父骨骼在前
+        bone_map = {}
+        for bone_data in data.bones:
+            parent = None
+            if bone_data.parent:
+                parent = bone_map.get(bone_data.parent.name)
+            bone = Bone(bone_data, parent)
+            bone_map[bone_data.name] = bone
+            self.all_bones.append(bone)
+        self.bones = list(self.all_bones)
+
+        # 初始化插槽 - 按照原始顺序
+        # slots_by_index 与 SkeletonData.slots 下标对齐（缺少骨骼的插槽为 None），self.slots 可能被筛选
+        self.slots_by_index = []
+        for slot_data in data.slots:
+            bone = bone_map.get(slot_data.bone_data.name)
+            slot = Slot(slot_data, bone) if bone else None
+            self.slots_by_index.append(slot)
+            if slot:
+                self.slots.append(slot)
+        self.setup_attachments = [None] * len(data.slots)
+
+        # 设置默认皮肤
+        if data.default_skin:
+            self.set_skin(data.default_skin)
+
+    def set_skin(self, skin: Skin):
+        self.skin = skin
+        # 各插槽的 setup 附件引用，播放附件时间轴时直接按下标读取
+        self.setup_attachments = [
+            skin.attachments.get((i, slot_data.attachment_name)) if skin and slot_data.attachment_name is not None else None
+            for i, slot_data in enumerate(self.data.slots)
+        ]
+        if not skin:
+            return
+
+        for i, slot in enumerate(self.slots_by_index):
+            if slot is None:
+                continue
+            slot_data = slot.data
+            attachment_name = slot_data.attachment_name
+
+            if attachment_name is None:
+                continue
+
+            key = (i, attachment_name)
+            attachment = skin.attachments.get(key)
+
+            if attachment:
+                slot.set_attachment(attachment)
+            else:
+                print(f"[WARNING] Missing attachment for slot '{slot_data.name}' (index {i}) with name '{attachment_name}'")
+
+    def reset_slot_colors(self):
+        np.copyto(self.slot_colors, self.setup_slot_colors)
+        np.copyto(self.slot_dark_colors, self.setup_dark_colors)
+
+    def update_world_transform(self):
+        """更新所有骨骼的世界变换"""
+        for bone in self.bones:
+            if bone.active:
+                bone.update_world_transform()
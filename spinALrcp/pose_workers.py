@@ -0,0 +1,307 @@
+"""多进程姿态计算：每个工作进程负责一段骨架实例，把世界矩阵写入共享内存
+
+    pool = PosePool(atlas_path, json_path, instances=200, workers=4)
+    pool.set(i, "attack", t)      # 设置每个实例的动画与时间
+    pool.submit()                 # 工作进程开始写后台缓冲
+    ...                           # 同时渲染 pool.front（上一帧的姿态）
+    pool.collect()                # 等待写完并交换前后缓冲
+
+前后两份缓冲按帧交替：工作进程只写后台缓冲，渲染进程只读前台缓冲，
+collect() 之后才交换，所以不会读到写了一半的姿态。只依赖 numpy，不导入 pygame。
+
+    python pose_workers.py skel/xianghe.json --instances 200 --workers 4
+"""
+import os
+import io
+import sys
+import argparse
+import contextlib
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from atlas import Atlas
+from loader import SkeletonJson
+from pose import SkeletonPose
+from animation import apply_animation
+from profiler import perf_counter
+
+POSE_COMPONENTS = 6  # a, b, c, d, world_x, world_y
+
+
+def attachment_keys(skeleton_data) -> list:
+    """默认皮肤的附件键 (slot_index, name)，各进程按同样顺序编号"""
+    skin = skeleton_data.default_skin
+    return list(skin.attachments.keys()) if skin else []
+
+
+def _load(atlas_path: str, json_path: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SkeletonJson(Atlas(atlas_path)).read_skeleton_data(json_path)
+
+
+class _SharedArray:
+    """共享内存上的 numpy 数组；创建者负责 unlink"""
+    def __init__(self, shape, dtype, name: str = None):
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(atlas_path, json_path, names, shapes, start, stop, conn, loop=True):
+    """工作进程：每收到一帧，计算 [start, stop) 实例并写入指定缓冲"""
+    poses = attachments = params = None
+    try:
+        skeleton_data = _load(atlas_path, json_path)
+        animations = skeleton_data.animations
+        attachment_ids = {key: i for i, key in enumerate(attachment_keys(skeleton_data))}
+
+        poses = _SharedArray(shapes["poses"], np.float64, names["poses"])
+        attachments = _SharedArray(shapes["attachments"], np.int32, names["attachments"])
+        params = _SharedArray(shapes["params"], np.float64, names["params"])
+        skeletons = [SkeletonPose(skeleton_data) for _ in range(start, stop)]
+        conn.send(("ready", None))
+
+        while True:
+            buffer = conn.recv()
+            if buffer is None:
+                break
+            pose_out = poses.array[buffer]
+            attachment_out = attachments.array[buffer]
+            for offset, skeleton in enumerate(skeletons):
+                index = start + offset
+                animation_index, time = params.array[index]
+                if 0 <= animation_index < len(animations):
+                    apply_animation(skeleton, animations[int(animation_index)], float(time), loop)
+                for bone in skeleton.all_bones:
+                    bone.update_world_transform()
+                pose_out[index] = [(bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y)
+                                   for bone in skeleton.all_bones]
+                # 同一个附件对象可能挂在多个插槽下，按 (插槽下标, 附件名) 编号；
+                # 按数据下标遍历，skeleton.slots 可能被筛选过
+                attachment_out[index] = [attachment_ids.get((i, slot.attachment.name), -1)
+                                         if slot is not None and slot.attachment else -1
+                                         for i, slot in enumerate(skeleton.slots_by_index)]
+            conn.send(("done", buffer))
+    except Exception as error:
+        conn.send(("error", f"{type(error).__name__}: {error}"))
+    finally:
+        for shared in (poses, attachments, params):
+            if shared is not None:
+                shared.close()
+        conn.close()
+
+
+class PoseView:
+    """把池中某个实例的前台姿态交给 runtime.Skeleton（设置为 skeleton.pose_source）"""
+    def __init__(self, pool: 'PosePool', instance: int):
+        self.pool = pool
+        self.instance = instance
+
+    def apply(self, skeleton):
+        pose = self.pool.front[self.instance]
+        for bone, (a, b, c, d, x, y) in zip(skeleton.all_bones, pose.tolist()):
+            bone.a, bone.b, bone.c, bone.d, bone.world_x, bone.world_y = a, b, c, d, x, y
+
+        keys = self.pool.attachment_keys
+        skin = skeleton.skin
+        # 两侧都按数据下标对齐（slots_by_index），不受 skeleton.slots 筛选影响
+        for slot, attachment_id in zip(skeleton.slots_by_index, self.pool.front_attachments[self.instance].tolist()):
+            if slot is None:
+                continue
+            attachment = skin.attachments.get(keys[attachment_id]) if skin and attachment_id >= 0 else None
+            if attachment is not slot.attachment:
+                slot.set_attachment(attachment)
+
+
+class PosePool:
+    """工作进程池 + 双缓冲共享姿态
+
+    front: (instances, bones, 6) float64，前台缓冲的只读视图（不复制）
+    front_attachments: (instances, slots) int32，attachment_keys 中的下标，-1 表示无附件
+    loop=False 时时间不取模，超出时长停在最后一帧（golden 对比用）
+    """
+    def __init__(self, atlas_path: str, json_path: str, instances: int, workers: int = None, skeleton_data=None,
+                 loop: bool = True):
+        if skeleton_data is None:
+            skeleton_data = _load(atlas_path, json_path)
+        self.skeleton_data = skeleton_data
+        self.animation_index = {animation.name: i for i, animation in enumerate(skeleton_data.animations)}
+        self.attachment_keys = attachment_keys(skeleton_data)
+        self.instances = instances
+        workers = max(1, min(workers or os.cpu_count() or 1, instances))
+
+        shapes = {
+            "poses": (2, instances, len(skeleton_data.bones), POSE_COMPONENTS),
+            "attachments": (2, instances, len(skeleton_data.slots)),
+            "params": (instances, 2),
+        }
+        self._poses = _SharedArray(shapes["poses"], np.float64)
+        self._attachments = _SharedArray(shapes["attachments"], np.int32)
+        self._params = _SharedArray(shapes["params"], np.float64)
+        self._attachments.array.fill(-1)
+        self.params = self._params.array
+        self.params[:, 0] = -1
+        names = {"poses": self._poses.name, "attachments": self._attachments.name, "params": self._params.name}
+
+        # spawn：不继承渲染进程里的 pygame / 线程状态
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        self._front = 0
+        self._pending = False
+        self.frames = 0
+        for start, stop in self._split(instances, workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker_main, daemon=True,
+                                      args=(atlas_path, json_path, names, shapes, start, stop, child, loop))
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self._wait("ready")
+
+    @staticmethod
+    def _split(instances: int, workers: int) -> list:
+        bounds = np.linspace(0, instances, workers + 1).astype(int)
+        return [(int(bounds[i]), int(bounds[i + 1])) for i in range(workers) if bounds[i] < bounds[i + 1]]
+
+    def _wait(self, expected: str):
+        for conn in self._connections:
+            try:
+                status, detail = conn.recv()
+            except EOFError:
+                status, detail = "error", "进程意外退出"
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"姿态工作进程出错: {detail}")
+            if status != expected:
+                self.close()
+                raise RuntimeError(f"姿态工作进程返回 {status}，期望 {expected}")
+
+    @property
+    def front(self) -> np.ndarray:
+        return self._poses.array[self._front]
+
+    @property
+    def front_attachments(self) -> np.ndarray:
+        return self._attachments.array[self._front]
+
+    def set(self, instance: int, animation, time: float):
+        """animation 为动画名或下标，None 表示保持 setup pose"""
+        if isinstance(animation, str):
+            animation = self.animation_index[animation]
+        self.params[instance] = (-1 if animation is None else animation, time)
+
+    def submit(self):
+        """让工作进程按当前 params 写后台缓冲；params 在 collect() 之前不要修改"""
+        if self._pending:
+            raise RuntimeError("上一帧还没有 collect()")
+        back = 1 - self._front
+        for conn in self._connections:
+            conn.send(back)
+        self._pending = True
+
+    def collect(self):
+        """等待所有工作进程写完，然后交换前后缓冲"""
+        if not self._pending:
+            return
+        self._wait("done")
+        self._pending = False
+        self._front = 1 - self._front
+        self.frames += 1
+
+    def step(self):
+        self.submit()
+        self.collect()
+
+    def view(self, instance: int) -> PoseView:
+        return PoseView(self, instance)
+
+    def close(self):
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._processes = []
+        for shared in (self._poses, self._attachments, self._params):
+            if shared.shm is not None:
+                shared.close()
+                shared.shm = None
+        self.params = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程姿态计算吞吐量")
+    parser.add_argument("json")
+    parser.add_argument("--atlas")
+    parser.add_argument("--instances", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--fps", type=float, default=60)
+    args = parser.parse_args(argv)
+
+    atlas_path = args.atlas or os.path.splitext(args.json)[0] + ".atlas"
+    skeleton_data = _load(atlas_path, args.json)
+    animations = skeleton_data.animations
+
+    def set_frame(setter, frame):
+        for i in range(args.instances):
+            animation = i % len(animations) if animations else None
+            setter(i, animation, frame / args.fps + i * 0.01)
+
+    # 单进程基线
+    skeletons = [SkeletonPose(skeleton_data) for _ in range(args.instances)]
+    start = perf_counter()
+    for frame in range(args.frames):
+        def apply(i, animation, time):
+            if animation is not None:
+                apply_animation(skeletons[i], animations[animation], time)
+            for bone in skeletons[i].all_bones:
+                bone.update_world_transform()
+        set_frame(apply, frame)
+    single = perf_counter() - start
+
+    with PosePool(atlas_path, args.json, args.instances, args.workers, skeleton_data) as pool:
+        start = perf_counter()
+        for frame in range(args.frames):
+            set_frame(pool.set, frame)
+            pool.step()
+        pooled = perf_counter() - start
+        workers = len(pool._processes)
+
+    print(f"{args.instances} instances x {args.frames} frames")
+    print(f"single process: {single / args.frames * 1000:8.2f} ms/frame")
+    print(f"{workers} workers:    {pooled / args.frames * 1000:8.2f} ms/frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import csv
+import time
+from collections import deque
+from typing import Dict
+
+perf_counter = time.perf_counter
+
+
+class FrameProfiler:
+    """按帧累计各阶段耗时并写入环形缓冲
+
+    调用方按下面的方式埋点，关闭时只多一次属性判断：
+
+        profiling = PROFILER.enabled
+        if profiling:
+            start = perf_counter()
+        ...
+        if profiling:
+            PROFILER.add("skeleton.transform", perf_counter() - start)
+    """
+    def __init__(self, capacity: int = 240):
+        self.enabled = False
+        self.capacity = capacity
+
+        self._current: Dict[str, float] = {}
+        self.history: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self.counters: Dict[str, deque] = {}
+        self.frame_times = deque(maxlen=capacity)
+        self.frame_numbers = deque(maxlen=capacity)
+        self.frames = 0
+        self._frame_start = None
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+        self._frame_start = None
+        self._current.clear()
+        self._counts.clear()
+
+    def add(self, phase: str, seconds: float):
+        """累计本帧某阶段耗时"""
+        self._current[phase] = self._current.get(phase, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1):
+        """累计本帧计数（如新建 Surface 数）"""
+        self._counts[name] = self._counts.get(name, 0) + n
+
+    def end_frame(self):
+        """把本帧累计值推入环形缓冲；帧时间为两次 end_frame 之间的间隔"""
+        if not self.enabled:
+            return
+        now = perf_counter()
+        frame_time = 0.0 if self._frame_start is None else now - self._frame_start
+        self._frame_start = now
+
+        # 新出现的阶段补齐历史长度，保证各列按帧对齐
+        for phase in self._current:
+            if phase not in self.history:
+                self.history[phase] = deque([0.0] * len(self.frame_times), maxlen=self.capacity)
+        for phase, values in self.history.items():
+            values.append(self._current.get(phase, 0.0))
+        for name in self._counts:
+            if name not in self.counters:
+                self.counters[name] = deque([0] * len(self.frame_times), maxlen=self.capacity)
+        for name, values in self.counters.items():
+            values.append(self._counts.get(name, 0))
+
+        self.frame_times.append(frame_time)
+        self.frame_numbers.append(self.frames)
+        self.frames += 1
+        self._current.clear()
+        self._counts.clear()
+
+    def reset(self):
+        self._current.clear()
+        self.history.clear()
+        self._counts.clear()
+        self.counters.clear()
+        self.frame_times.clear()
+        self.frame_numbers.clear()
+        self.frames = 0
+        self._frame_start = None
+
+    @staticmethod
+    def _stats(values) -> dict:
+        if not values:
+            return {"last_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(values)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return {
+            "last_ms": values[-1] * 1000,
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p95_ms": p95 * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+
+    def get_frame_stats(self) -> dict:
+        return self._stats(self.frame_times)
+
+    def get_phase_stats(self) -> Dict[str, dict]:
+        """各阶段在缓冲区内的 last/mean/p95/max（毫秒）"""
+        return {phase: self._stats(values) for phase, values in self.history.items()}
+
+    def get_counter_stats(self) -> Dict[str, dict]:
+        """各计数在缓冲区内的 last/mean/max（每帧）"""
+        stats = {}
+        for name, values in self.counters.items():
+            if values:
+                stats[name] = {"last": values[-1], "mean": sum(values) / len(values), "max": max(values)}
+        return stats
+
+    def dump_csv(self, path: str):
+        """每行一帧：frame, frame_ms, 各阶段 ms, 各计数"""
+        phases = sorted(self.history)
+        counters = sorted(self.counters)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms"] + phases + counters)
+            for i, frame in enumerate(self.frame_numbers):
+                row = [frame, f"{self.frame_times[i] * 1000:.4f}"]
+                row.extend(f"{self.history[phase][i] * 1000:.4f}" for phase in phases)
+                row.extend(self.counters[name][i] for name in counters)
+                writer.writerow(row)
+
+
+# 进程内共享的分析器，默认关闭
+PROFILER = FrameProfiler()
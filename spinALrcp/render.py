@@ -1,5 +1,8 @@
 import pygame
 import math
+import numpy as np
+from collections import OrderedDict
+from profiler import PROFILER, perf_counter
 
 class MathUtils:
     """实现类似 Spine 的数学工具类"""
@@ -20,6 +23,63 @@ class MathUtils:
     def atan2(y, x):
         return math.atan2(y, x)
 
+# 混合模式 -> pygame blit 标志
+BLEND_FLAGS = {
+    "normal": 0,
+    "additive": pygame.BLEND_RGB_ADD,
+}
+
+class DrawList:
+    """整帧的扁平绘制列表，帧间原地复用，按混合模式分组提交给 Surface.blits"""
+    def __init__(self):
+        self.items = []  # [surface, dest, area, flags]
+        self.count = 0
+
+        # 上一次提交的统计
+        self.draw_calls = 0
+        self.blit_count = 0
+
+    def add(self, source, dest, area=None, flags=0):
+        """追加一项绘制，复用已有的列表槽位"""
+        if self.count < len(self.items):
+            item = self.items[self.count]
+            item[0] = source
+            item[1] = dest
+            item[2] = area
+            item[3] = flags
+        else:
+            self.items.append([source, dest, area, flags])
+        self.count += 1
+
+    def clear(self):
+        """清空列表；槽位保留复用，但不再引用 Surface"""
+        items = self.items
+        for i in range(self.count):
+            items[i][0] = None
+        self.count = 0
+
+    def submit(self, target):
+        """每个连续的混合分组调用一次 blits，之后清空列表"""
+        items = self.items
+        count = self.count
+        draw_calls = 0
+        start = 0
+        while start < count:
+            flags = items[start][3]
+            end = start + 1
+            while end < count and items[end][3] == flags:
+                end += 1
+            if start == 0 and end == len(items):
+                target.blits(items, doreturn=False)
+            else:
+                target.blits(items[start:end], doreturn=False)
+            draw_calls += 1
+            start = end
+
+        self.draw_calls = draw_calls
+        self.blit_count = count
+        self.clear()
+
 class AttachmentSprite:
     def __init__(self, name, attachment, image):
         self.name = name
@@ -32,6 +92,10 @@ class AttachmentSprite:
         self.bound_bone = None
         
     def update(self, screen, skeleton):
+        profiling = PROFILER.enabled
+        if profiling:
+            start = perf_counter()
+
         if self.bound_bone:
             bone = self.bound_bone
             
@@ -113,13 +177,297 @@ class AttachmentSprite:
             
             # 设置图片位置
             self.rotated_rect = self.rotated_image.get_rect(center=(screen_x, screen_y))
+            if profiling:
+                PROFILER.count("surfaces", 2 + (attachment_scale_x < 0 or attachment_scale_y < 0))
+
+        if profiling:
+            PROFILER.add("sprite.update", perf_counter() - start)
+
+    def draw(self, surface, font, draw_list=None):
+        profiling = PROFILER.enabled
+        if profiling:
+            start = perf_counter()
 
-    def draw(self, surface, font):
         if hasattr(self, 'rotated_image') and hasattr(self, 'rotated_rect'):
-            surface.blit(self.rotated_image, self.rotated_rect.topleft)
+            # 没有传入绘制列表时直接提交
+            direct = draw_list is None
+            if direct:
+                draw_list = DrawList()
+            draw_list.add(self.rotated_image, self.rotated_rect.topleft)
             label = font.render(self.name, True, (0, 0, 0))
-            surface.blit(label, (self.rotated_rect.x, self.rotated_rect.y - 18))
+            draw_list.add(label, (self.rotated_rect.x, self.rotated_rect.y - 18))
             if self.bound_bone:
                 bname = self.bound_bone.data.name
                 label2 = font.render(f"→ {bname}", True, (100, 0, 0))
-                surface.blit(label2, (self.rotated_rect.x, self.rotated_rect.y - 36))
\ No newline at end of file
+                draw_list.add(label2, (self.rotated_rect.x, self.rotated_rect.y - 36))
+            if direct:
+                draw_list.submit(surface)
+
+        if profiling:
+            PROFILER.add("sprite.draw", perf_counter() - start)
+
+class SurfaceCache:
+    """变换后附件贴图的 LRU 缓存，命中检测用的 Mask 与贴图共用同一个 key"""
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.masks = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.mask_builds = 0
+
+    def get(self, key):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.surfaces.move_to_end(key)
+        self.hits += 1
+        return surface
+
+    def put(self, key, surface):
+        self.surfaces[key] = surface
+        self.surfaces.move_to_end(key)
+        while len(self.surfaces) > self.max_entries:
+            old_key, _ = self.surfaces.popitem(last=False)
+            self.masks.pop(old_key, None)
+
+    def get_mask(self, key, surface):
+        """按贴图 key 缓存 pygame.mask.Mask；key 为 None（如被裁剪的贴图）时不缓存"""
+        if key is None:
+            self.mask_builds += 1
+            if PROFILER.enabled:
+                PROFILER.count("masks")
+            return pygame.mask.from_surface(surface)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(surface)
+            self.mask_builds += 1
+            if PROFILER.enabled:
+                PROFILER.count("masks")
+            if key in self.surfaces:
+                self.masks[key] = mask
+        return mask
+
+    def clear(self):
+        self.surfaces.clear()
+        self.masks.clear()
+
+
+TINT_LEVELS = 32  # 染色 RGB 每通道的量化级数
+NO_TINT = (TINT_LEVELS, TINT_LEVELS, TINT_LEVELS, -1, -1, -1)
+
+
+def quantize_tints(colors: np.ndarray, dark_colors: np.ndarray, two_color: np.ndarray) -> np.ndarray:
+    """(N, 4) 颜色 -> (N, 7) int：量化 RGB、alpha（0..255）与量化暗部 RGB，无双色的暗部为 -1"""
+    tints = np.empty((len(colors), 7), dtype=np.int32)
+    np.rint(np.clip(colors[:, :3], 0.0, 1.0) * TINT_LEVELS, out=tints[:, :3], casting="unsafe")
+    tints[:, 3] = np.clip(colors[:, 3], 0.0, 1.0) * 255
+    np.rint(np.clip(dark_colors, 0.0, 1.0) * TINT_LEVELS, out=tints[:, 4:], casting="unsafe")
+    tints[~two_color, 4:] = -1
+    return tints
+
+
+def tint_surface(source: pygame.Surface, tint: tuple) -> pygame.Surface:
+    """按量化颜色 (r, g, b, dark_r, dark_g, dark_b) 染色一份副本
+
+    单色为逐通道相乘；双色按 Spine 的 rgb = dark + tex * (light - dark)。
+    """
+    light = [round(c * 255 / TINT_LEVELS) for c in tint[:3]]
+    surface = source.copy()
+    if tint[3] < 0:
+        surface.fill((*light, 255), special_flags=pygame.BLEND_RGB_MULT)
+        return surface
+    dark = np.array([c * 255 / TINT_LEVELS for c in tint[3:]], dtype=np.float32)
+    pixels = pygame.surfarray.pixels3d(surface)
+    blended = dark + pixels * ((np.array(light, dtype=np.float32) - dark) / 255)
+    pixels[...] = np.clip(blended, 0, 255)
+    del pixels
+    return surface
+
+
+class TintCache:
+    """按 (区域, 量化颜色) 缓存染色后的区域贴图，颜色不变时不再逐像素相乘"""
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, region, tint: tuple) -> pygame.Surface:
+        """tint 为 quantize_tints 去掉 alpha 的六元组"""
+        key = (id(region), tint)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = tint_surface(region.texture, tint)
+        if PROFILER.enabled:
+            PROFILER.count("surfaces")
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class StaticLayer:
+    """预合成的静态图层（预乘 Alpha）"""
+    def __init__(self, surface, position, debug_points, item_rects):
+        self.surface = surface
+        self.position = position
+        self.debug_points = debug_points
+        self.item_rects = item_rects  # [(slot_index, attachment, rect, surface_key, surface)]
+
+
+class StaticLayerCache:
+    """把骨骼链不受当前动画驱动的附件预合成为图层，在动画插槽穿插处切分
+
+    每组不同的绘制项（Skeleton 按绘制顺序与各插槽当前附件缓存的列表）各保留一套图层，
+    draw order 或附件来回切换时不重建。
+    """
+    MAX_LAYER_SETS = 16
+
+    def __init__(self):
+        self.key = None
+        self.skin = None
+        self.layers = {}  # id(items) -> (items, runs)
+        self.runs = []
+
+        self.hits = 0
+        self.builds = 0
+
+    def invalidate(self):
+        self.key = None
+        self.layers = {}
+        self.runs = []
+
+    def all_runs(self):
+        """所有已缓存绘制顺序的图层切分"""
+        for _, runs in self.layers.values():
+            yield from runs
+
+    def get_runs(self, skeleton, surface_size, items):
+        """返回 [(StaticLayer, None) | (None, live_items)]，动画/皮肤/渲染设置变化时自动重建
+
+        items 为 Skeleton.get_ordered_draw_items 返回的（缓存的）绘制项列表。
+        """
+        settings = skeleton.render_settings
+        key = (
+            skeleton.animation_name,
+            surface_size,
+            settings.scale,
+            settings.position_x,
+            settings.position_y,
+            settings.flip_x,
+            settings.flip_y,
+            settings.use_premultiplied_alpha,
+            skeleton.r,
+            skeleton.g,
+            skeleton.b,
+            skeleton.a,
+        )
+        if key != self.key or skeleton.skin is not self.skin:
+            self.key = key
+            self.skin = skeleton.skin
+            self.layers = {}
+
+        cached = self.layers.get(id(items))
+        if cached is not None and cached[0] is items:
+            self.hits += 1
+            self.runs = cached[1]
+            return self.runs
+
+        if len(self.layers) >= self.MAX_LAYER_SETS:
+            self.layers.clear()
+        self.runs = self._build(skeleton, surface_size, items)
+        self.layers[id(items)] = (items, self.runs)
+        self.builds += 1
+        return self.runs
+
+    def _build(self, skeleton, surface_size, items):
+        center_x = surface_size[0] // 2
+        center_y = surface_size[1] // 2
+
+        runs = []
+        static_run = []
+        live_run = []
+
+        def flush_static():
+            if static_run:
+                # 每个图层拿到独立的列表，static_run 之后会被清空复用
+                layer = self._composite(skeleton, list(static_run), center_x, center_y)
+                if layer is not None:
+                    runs.append((layer, None))
+                static_run.clear()
+
+        for item in items:
+            bone, attachment, slot_index = item
+            slot_data = skeleton.data.slots[slot_index]
+            clip = skeleton.get_clip(slot_index)
+            is_static = (
+                slot_data.name not in skeleton.animated_slot_names
+                and BLEND_FLAGS.get(slot_data.blend_mode, 0) == 0
+                and not skeleton.is_bone_chain_animated(bone)
+                and (clip is None or not skeleton.is_bone_chain_animated(clip.bone))
+            )
+            if is_static:
+                if live_run:
+                    runs.append((None, live_run))
+                    live_run = []
+                static_run.append(item)
+            else:
+                flush_static()
+                live_run.append(item)
+
+        flush_static()
+        if live_run:
+            runs.append((None, live_run))
+        return runs
+
+    def _composite(self, skeleton, items, center_x, center_y):
+        """在预乘空间合成一组静态附件，保证叠加结果与逐个绘制一致"""
+        pieces = []
+        debug_points = []
+        item_rects = []
+        bounds = None
+        allocations = 0
+        tints = skeleton.item_tints(items)
+        for (bone, attachment, slot_index), tint in zip(items, tints):
+            result = skeleton.transform_attachment(bone, attachment, center_x, center_y,
+                                                   skeleton.get_clip(slot_index), tint)
+            if result is None:
+                continue
+            texture, px, py, key = result
+            rect = texture.get_rect(topleft=(int(px - texture.get_width() // 2), int(py - texture.get_height() // 2)))
+            item_rects.append((slot_index, attachment, rect, key, texture))
+
+            # 整体透明度并入像素 Alpha 后再预乘（缓存中的贴图不能改动）
+            alpha = texture.get_alpha()
+            if alpha is not None and alpha < 255:
+                texture = texture.copy()
+                texture.set_alpha(None)
+                texture.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+                allocations += 1
+
+            pieces.append((texture.premul_alpha(), rect))
+            debug_points.append((int(px), int(py)))
+            bounds = rect.copy() if bounds is None else bounds.union(rect)
+
+        if bounds is None:
+            return None
+
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for piece, rect in pieces:
+            surface.blit(piece, (rect.x - bounds.x, rect.y - bounds.y), special_flags=pygame.BLEND_PREMULTIPLIED)
+        if PROFILER.enabled:
+            # 每块预乘副本 + 图层本身
+            PROFILER.count("surfaces", allocations + len(pieces) + 1)
+        return StaticLayer(surface, bounds.topleft, debug_points, item_rects)
@@ -1,179 +1,115 @@
-from skeleton_data import BoneData, SlotData, RegionAttachment, Attachment, Skin, SkeletonData
-from mytypes import Color, SpineRenderSettings, AttachmentType
+from skeleton_data import RegionAttachment, Skin, SkeletonData
+from mytypes import SpineRenderSettings, AttachmentType
+from pose import Bone, Slot, SkeletonPose
 import math
+import numpy as np
 import pygame
-from dataclasses import dataclass, field
+import textures  # 注册 pygame 贴图加载器
+from render import DrawList, StaticLayerCache, SurfaceCache, TintCache, BLEND_FLAGS, NO_TINT, quantize_tints
+from colors import pack_colors
+from clipping import ClipPolygon, apply_clip_mask
+from hittest import BoundingPolygon
+from bounds import RegionTable, world_bounds, to_screen, bake_bounds
+from profiler import PROFILER, perf_counter
 from typing import Optional
 
 
-@dataclass
-class Bone:
-    """骨骼实例，所有坐标系相关的变换都在这里处理"""
-    data: 'BoneData'  # 需要定义在前面
-    parent: Optional['Bone'] = None
-    
-    # 本地变换属性
-    x: float = 0
-    y: float = 0
-    rotation: float = 0
-    scaleX: float = 1
-    scaleY: float = 1
-    shearX: float = 0
-    shearY: float = 0
-    
-    # 激活状态
-    active: bool = True
-    
-    # 世界变换矩阵
-    a: float = 1  # scale * cos
-    b: float = 0  # scale * sin
-    c: float = 0  # -sin * scale
-    d: float = 1  # cos * scale
-    world_x: float = 0
-    world_y: float = 0
-    
-    def __post_init__(self):
-        """初始化完成后设置初始状态"""
-        self.x = self.data.x
-        self.y = self.data.y
-        self.rotation = self.data.rotation
-        self.scaleX = self.data.scaleX
-        self.scaleY = self.data.scaleY
-        self.shearX = self.data.shearX
-        self.shearY = self.data.shearY
-        self.update_world_transform()
-    
-    def update_world_transform(self):
-        """更新世界变换 - 基于Spine v38的实现"""
-        rotation = math.radians(self.rotation)
-        cos = math.cos(rotation)
-        sin = math.sin(rotation)
-        
-        # 本地变换矩阵
-        self.a = cos * self.scaleX
-        self.b = sin * self.scaleX
-        self.c = -sin * self.scaleY
-        self.d = cos * self.scaleY
-        
-        if self.parent:
-            # 组合父骨骼变换
-            pa = self.parent.a
-            pb = self.parent.b
-            pc = self.parent.c
-            pd = self.parent.d
-            
-            # 计算世界坐标
-            self.world_x = self.x * pa + self.y * pb + self.parent.world_x
-            self.world_y = self.x * pc + self.y * pd + self.parent.world_y
-            
-            # 合并变换矩阵
-            temp_a = self.a
-            temp_b = self.b
-            temp_c = self.c
-            temp_d = self.d
-            
-            self.a = temp_a * pa + temp_b * pc
-            self.b = temp_a * pb + temp_b * pd
-            self.c = temp_c * pa + temp_d * pc
-            self.d = temp_c * pb + temp_d * pd
-        else:
-            # 没有父骨骼，直接使用本地坐标
-            self.world_x = self.x
-            self.world_y = self.y
-
-class Slot:
-    """插槽实例"""
-    def __init__(self, data: SlotData, bone: 'Bone'):
-        self.data = data
-        self.bone = bone
-        self.color = Color(*data.color.__dict__.values())
-        self.attachment: Optional[Attachment] = None
-        self.attachment_time = 0
-        self.blend_mode = data.blend_mode  # 使用枚举
-        
-        # 颜色分量
-        self.r = 1.0
-        self.g = 1.0
-        self.b = 1.0
-        self.a = 1.0
-
-    def set_attachment(self, attachment: Optional[Attachment]):
-        """设置附件"""
-        self.attachment = attachment
-        self.attachment_time = 0
+class PreparedFrame:
+    """一帧的绘制列表、命中检测矩形与调试点"""
+    def __init__(self):
+        self.draw_list = DrawList()
+        self.hit_items = []  # (slot_index, attachment, rect, key, texture)
+        self.debug_points = []
+        self.center = (0, 0)
+        self.empty = True
 
 
-class Skeleton:
-
+class Skeleton(SkeletonPose):
+    """带 pygame 渲染、缓存与拾取的骨架实例"""
     def __init__(self, data: SkeletonData):
         self.r = 1.0  # 红色分量
         self.g = 1.0  # 绿色分量
         self.b = 1.0  # 蓝色分量
         self.a = 1.0  
 
-        self.data = data
-        self.all_bones = []
-        self.bones = []
-        self.slots = []
-        self.skin = None
         self.render_settings = SpineRenderSettings()
-        
-        # 初始化骨骼 - 确保父骨骼在前
-        bone_map = {}
-        for bone_data in data.bones:
-            parent = None
-            if bone_data.parent:
-                parent = bone_map.get(bone_data.parent.name)
-            bone = Bone(bone_data, parent)
-            bone_map[bone_data.name] = bone
-            self.bones.append(bone)
-        
-        # 初始化插槽 - 按照原始顺序
-        for slot_data in data.slots:
-            bone = bone_map.get(slot_data.bone_data.name)
-            if bone:
-                slot = Slot(slot_data, bone)
-                self.slots.append(slot)
-                
-        # 设置默认皮肤
-        if data.default_skin:
-            self.set_skin(data.default_skin)
-            
-    def set_skin(self, skin: Skin):
-        self.skin = skin
-        if not skin:
-            return
+        # prepare_frame / present_frame 交替使用的两份帧数据
+        self._frames = (PreparedFrame(), PreparedFrame())
+        self._frame_index = 0
+
+        # 当前动画驱动的骨骼/插槽，None 表示未设置动画
+        self.animation_name = None
+        self.animated_bone_names = None
+        self.animated_slot_names = None
+        self.static_layers = StaticLayerCache()
+        self._draw_items = None  # (id(draw_order), 各插槽当前附件的 id) -> (draw_order, 绘制项)，None 表示需要重置
+        self._draw_positions = {}  # id(draw_order) -> (draw_order, 每个插槽在该顺序中的位置)
+        self._clips = []
+
+        # 可选的拾取索引（spatial.PickIndex）
+        self.pick_index = None
+        # LOD 降级时关闭裁剪
+        self.clipping = True
+        # 可选的外部姿态来源（pose_workers.PoseView），设置后不再逐骨骼计算世界变换
+        self.pose_source = None
+
+        # 变换后贴图缓存与命中检测数据
+        self.surface_cache = SurfaceCache()
+        self.tint_cache = TintCache()
+        self._tint_inputs = {}  # ((slot_index, id(attachment)), ...) -> (插槽下标, 附件颜色 (N, 4))
+        self._hit_items = []
+        self._hit_bounds = None
+        self._hit_center = (0, 0)
+        self._bounding_boxes = None
+        self._region_table = None
+        self._bounds_items = None  # (draw items, 行号, 骨骼下标)
+
+        # 骨骼、插槽与默认皮肤
+        super().__init__(data)
+
+    @property
+    def draw_list(self) -> DrawList:
+        """最近一次 prepare_frame 的绘制列表（提交后保留 draw_calls / blit_count 统计）"""
+        return self._frames[self._frame_index ^ 1].draw_list
 
-        for i, slot in enumerate(self.slots):
-            slot_data = slot.data
-            attachment_name = slot_data.attachment_name
+    def set_skin(self, skin: Skin):
+        self._draw_items = None
+        self._bounding_boxes = None
+        self._region_table = None
+        super().set_skin(skin)
 
-            if attachment_name is None:
-                continue
 
-            key = (i, attachment_name)
-            attachment = skin.attachments.get(key)
+    def update_world_transform(self):
+        """更新所有骨骼的世界变换"""
+        profiling = PROFILER.enabled
+        if profiling:
+            start = perf_counter()
 
-            if attachment:
-                slot.set_attachment(attachment)
-            else:
-                print(f"[WARNING] Missing attachment for slot '{slot_data.name}' (index {i}) with name '{attachment_name}'")
+        if self.pose_source is not None:
+            self.pose_source.apply(self)
+        else:
+            for bone in self.bones:
+                if bone.active:
+                    bone.update_world_transform()
 
+        if profiling:
+            now = perf_counter()
+            PROFILER.add("skeleton.transform", now - start)
+            start = now
 
-    def update_world_transform(self):
-        """更新所有骨骼的世界变换"""
-        for bone in self.bones:
-            if bone.active:
-                bone.update_world_transform()
+        if self.pick_index is not None:
+            self.pick_index.update_bones(self)
+            if profiling:
+                PROFILER.add("skeleton.pick_index", perf_counter() - start)
 
 
     def reset_bones_from_names(self, bone_names: set[str]):
         """根据骨骼名激活/停用骨骼，并确保父子关系完整"""
         # 保留原有骨骼实例，避免重复创建
-        bone_instance_map = {bone.data.name: bone for bone in self.bones}
+        bone_instance_map = {bone.data.name: bone for bone in self.all_bones}
         
         # 标记所有骨骼为非激活
-        for bone in self.bones:
+        for bone in self.all_bones:
             bone.active = False
         
         # 激活当前动画使用的骨骼及其父骨骼
@@ -192,108 +128,421 @@ class Skeleton:
         
         # 按依赖顺序排序骨骼（父在前）
         self.bones = sorted(
-            [bone for bone in self.bones if bone.active],
+            [bone for bone in self.all_bones if bone.active],
             key=lambda b: b.data.parent.name if b.data.parent else ""
         )
+        self._draw_items = None
+
+
+    def set_animated_parts(self, animation_name: Optional[str], bone_names: set[str], slot_names: set[str]):
+        """记录当前动画关键帧涉及的骨骼和插槽，用于区分静态部件"""
+        self.animation_name = animation_name
+        self.animated_bone_names = set(bone_names)
+        self.animated_slot_names = set(slot_names)
+        self._draw_items = None
+        self.static_layers.invalidate()
+
+    def is_bone_chain_animated(self, bone: Bone) -> bool:
+        """骨骼自身或任一父骨骼被当前动画驱动"""
+        names = self.animated_bone_names
+        while bone:
+            if bone.data.name in names:
+                return True
+            bone = bone.parent
+        return False
+
+    def get_draw_items(self):
+        """各插槽当前的区域附件，按 setup 绘制顺序排列的 (bone, attachment, slot_index) 列表"""
+        return self.get_ordered_draw_items(self.setup_draw_order)
+
+    def item_tints(self, items) -> list:
+        """每个绘制项的量化染色 (r, g, b, alpha, dark_r, dark_g, dark_b)，见 render.quantize_tints
+
+        骨架颜色 × 插槽颜色 × 附件颜色一次数组运算算完；插槽下标与打包的附件颜色
+        按 (slot_index, id(attachment)) 元组缓存，不依赖列表对象本身（列表可能被清空复用）。
+        """
+        key = tuple((slot_index, id(attachment)) for _, attachment, slot_index in items)
+        cached = self._tint_inputs.get(key)
+        if cached is None:
+            if len(self._tint_inputs) > 64:
+                self._tint_inputs.clear()
+            slot_indices = np.fromiter((slot_index for _, _, slot_index in items), dtype=np.intp, count=len(items))
+            attachment_colors = pack_colors([attachment.color for _, attachment, _ in items])
+            cached = self._tint_inputs[key] = (slot_indices, attachment_colors)
+        slot_indices, attachment_colors = cached
+        colors = self.slot_colors[slot_indices] * attachment_colors
+        colors *= np.array((self.r, self.g, self.b, self.a), dtype=np.float32)
+        tints = quantize_tints(colors, self.slot_dark_colors[slot_indices], self.two_color[slot_indices])
+        if len(tints) != len(items):
+            raise RuntimeError(f"染色数 {len(tints)} 与绘制项数 {len(items)} 不一致")
+        return list(map(tuple, tints.tolist()))
+
+    def get_ordered_draw_items(self, order=None):
+        """按绘制顺序（缺省为当前 draw_order）逐插槽取当前附件（slot.attachment）得到的绘制项
+
+        只绘制区域附件。按 (绘制顺序, 各插槽当前附件) 缓存，附件或绘制顺序关键帧切换时得到另一个列表，
+        切回时按引用取回原列表（静态图层与染色缓存依赖这一点）。
+        """
+        if self._draw_items is None:
+            # 皮肤或动画变化后重置依赖绘制项的缓存
+            self._draw_items = {}
+            self._tint_inputs = {}
+            self._clips = self._build_clips()
+        if order is None:
+            order = self.draw_order
+        slots = self.slots_by_index
+        attachments = [slot.attachment if slot is not None else None for slot in slots]
+        # 附件是不可哈希的 dataclass，按 id 组成键（附件常驻于皮肤中）
+        key = (id(order), tuple(map(id, attachments)))
+        cached = self._draw_items.get(key)
+        if cached is not None and cached[0] is order:
+            return cached[1]
+
+        if len(self._draw_items) > 64:
+            self._draw_items.clear()
+        items = []
+        for slot_index in order:
+            attachment = attachments[slot_index]
+            if attachment is not None and attachment.type == AttachmentType.Region:
+                items.append((slots[slot_index].bone, attachment, slot_index))
+        self._draw_items[key] = (order, items)
+        return items
+
+    def _build_clips(self):
+        """找出 setup 附件为裁剪附件的插槽，裁剪范围到 end 插槽为止"""
+        clips = []
+        if not self.skin:
+            return clips
 
+        slot_indices = {slot_data.name: i for i, slot_data in enumerate(self.data.slots)}
+        bone_map = {bone.data.name: bone for bone in self.all_bones}
+        for i, slot_data in enumerate(self.data.slots):
+            if slot_data.attachment_name is None:
+                continue
+            attachment = self.skin.attachments.get((i, slot_data.attachment_name))
+            if attachment is None or attachment.type != AttachmentType.Clipping:
+                continue
+            end_index = slot_indices.get(attachment.end_slot, len(self.data.slots) - 1)
+            bone = bone_map.get(slot_data.bone_data.name)
+            clips.append(ClipPolygon(attachment, bone, i, end_index, self.all_bones))
+        return clips
+
+    def draw_positions(self):
+        """当前 draw_order 中每个插槽的位置（按插槽下标），setup 顺序时返回 None"""
+        order = self.draw_order
+        if order is self.setup_draw_order:
+            return None
+        cached = self._draw_positions.get(id(order))
+        if cached is None or cached[0] is not order:
+            positions = [0] * len(order)
+            for position, slot_index in enumerate(order):
+                positions[slot_index] = position
+            cached = self._draw_positions[id(order)] = (order, positions)
+        return cached[1]
+
+    def get_clip(self, slot_index: int) -> Optional[ClipPolygon]:
+        """返回作用于该插槽的裁剪多边形，范围按当前绘制顺序计算"""
+        if not self.clipping or not self._clips:
+            return None
+        positions = self.draw_positions()
+        for clip in self._clips:
+            if clip.covers(slot_index, positions):
+                return clip
+        return None
+
+    def transform_attachment(self, bone: Bone, attachment: RegionAttachment, center_x: float, center_y: float,
+                             clip: Optional[ClipPolygon] = None, tint: Optional[tuple] = None):
+        """计算附件变换后的贴图与屏幕中心点，返回 (texture, px, py, key)，失败或被完全裁掉时返回 None
+
+        key 描述贴图的全部变换参数，用于 surface_cache；被裁剪的贴图与位置相关，key 为 None。
+        tint 为 item_tints 的一项，缺省时只按骨架与附件 alpha 混合、不染色。
+        """
+        region = attachment.region
+        if not region or not region.texture:
+            return None
+
+        settings = self.render_settings
+        scale = settings.scale
+        source = region.texture
+
+        # 贴图位置：骨骼位置 + 附件偏移
+        local_x = attachment.x
+        local_y = attachment.y
+        world_x = bone.world_x + local_x * bone.a + local_y * bone.b
+        world_y = bone.world_y + local_x * bone.c + local_y * bone.d
+
+        px = center_x + (world_x + settings.position_x) * scale
+        py = center_y + (world_y + settings.position_y) * scale
+
+        # 缩放
+        bone_scale_x = math.sqrt(bone.a ** 2 + bone.c ** 2)
+        bone_scale_y = math.sqrt(bone.b ** 2 + bone.d ** 2)
+        raw_scale_x = bone_scale_x * attachment.scaleX * scale
+        raw_scale_y = bone_scale_y * attachment.scaleY * scale
+        scale_x = abs(raw_scale_x)
+        scale_y = abs(raw_scale_y)
+
+        scaled = scale_x != 1 or scale_y != 1
+        if scaled:
+            new_w = max(1, int(source.get_width() * scale_x))
+            new_h = max(1, int(source.get_height() * scale_y))
+        else:
+            new_w, new_h = source.get_size()
 
-    def draw(self, surface: pygame.Surface):
-        self.update_world_transform()
+        # 旋转贴图（骨骼旋转 + 附件角度），量化到 0.1 度以便缓存复用
+        rotation = round(-math.degrees(math.atan2(bone.c, bone.a)) + attachment.rotation, 1)
 
-        screen_width = surface.get_width()
-        screen_height = surface.get_height()
-        center_x = screen_width // 2
-        center_y = screen_height // 2
+        # RGB 染色走 tint_cache，透明度用 set_alpha
+        if tint is None:
+            alpha = int(self.a * attachment.color.a * 255)
+            color = NO_TINT
+        else:
+            alpha = tint[3]
+            color = tint[:3] + tint[4:]
+        if not settings.use_premultiplied_alpha:
+            alpha = None
+
+        key = (id(region), new_w, new_h, settings.flip_x, settings.flip_y, rotation, alpha, color)
+        texture = self.surface_cache.get(key)
+        if texture is None:
+            profiling = PROFILER.enabled
+            if profiling:
+                start = perf_counter()
+
+            if color != NO_TINT:
+                source = self.tint_cache.get(region, color)
+            texture = source.copy()
+            if scaled:
+                try:
+                    texture = pygame.transform.smoothscale(texture, (new_w, new_h))
+                except ValueError:
+                    return None
 
-        scale = self.render_settings.scale
-        offset_x = self.render_settings.position_x
-        offset_y = self.render_settings.position_y
+            if settings.flip_x or settings.flip_y:
+                texture = pygame.transform.flip(texture, settings.flip_x, settings.flip_y)
+
+            if profiling:
+                now = perf_counter()
+                PROFILER.add("skeleton.smoothscale", now - start)
+                start = now
 
+            if rotation != 0:
+                texture = pygame.transform.rotate(texture, rotation)
+
+            if alpha is not None:
+                texture.set_alpha(alpha)
+            self.surface_cache.put(key, texture)
+
+            if profiling:
+                PROFILER.add("skeleton.rotate", perf_counter() - start)
+                PROFILER.count("surfaces", 1 + scaled + (settings.flip_x or settings.flip_y) + (rotation != 0))
+
+        # 裁剪附件：区域贴图走遮罩路径，结果按 (贴图 key, 裁剪多边形屏幕 key, 整数左上角) 缓存，
+        # 裁剪多边形与附件都没动的帧不分配新 Surface
+        if clip is not None:
+            polygon = clip.screen_polygon(center_x, center_y, settings)
+            topleft = (int(px - texture.get_width() // 2), int(py - texture.get_height() // 2))
+            key = ("clip", key, clip._screen_key, topleft)
+            clipped = self.surface_cache.get(key)
+            if clipped is None:
+                profiling = PROFILER.enabled
+                if profiling:
+                    start = perf_counter()
+
+                clipped = apply_clip_mask(texture, topleft, polygon)
+
+                if profiling:
+                    PROFILER.add("skeleton.clip", perf_counter() - start)
+                if clipped is None:
+                    return None
+                if profiling:
+                    PROFILER.count("surfaces", 2)
+                self.surface_cache.put(key, clipped)
+            texture = clipped
+
+        return texture, px, py, key
+
+    def _bounds_rows(self, table: RegionTable):
+        """当前绘制项（各插槽当前附件）对应的 RegionTable 行号与骨骼下标，随 get_draw_items 的结果缓存"""
+        items = self.get_draw_items()
+        cached = self._bounds_items
+        if cached is None or cached[0] is not items:
+            bone_indices = {id(bone): i for i, bone in enumerate(self.all_bones)}
+            rows = np.array([table.rows.get((slot_index, id(attachment)), -1)
+                             for _, attachment, slot_index in items], dtype=np.intp)
+            bones = np.array([bone_indices[id(bone)] for bone, _, _ in items], dtype=np.intp)
+            cached = self._bounds_items = (items, rows, bones)
+        return cached
+
+    def bake_bounds(self, animation, fps: float = None):
+        """按本骨架的皮肤预计算动画逐帧包围盒（记在 animation.bounds 上）
+
+        每帧取附件时间轴解析出的插槽附件，与绘制项（get_ordered_draw_items）一致。
+        """
+        return bake_bounds(self.data, animation, fps, self.skin)
+
+    def compute_bounds(self, surface_size=None, pose=None):
+        """返回 (世界 AABB, 屏幕 AABB)，均为 (x0, y0, x1, y1)
+
+        基于当前世界矩阵（或传入的 (B, 6) pose）一次性变换 draw 会绘制的区域附件（get_draw_items）的四角；
+        没有可见附件时为 (None, None)，不传 surface_size 时屏幕 AABB 为 None。
+        """
+        table = self._region_table
+        if table is None:
+            table = self._region_table = RegionTable(self.data, self.skin)
+        _, rows, bones = self._bounds_rows(table)
+        world = world_bounds(self, table, pose, rows, bones)
+        if world is None or surface_size is None:
+            return world, None
+        return world, to_screen(world, self.render_settings, surface_size)
+
+    def prepare_frame(self, surface_size) -> 'PreparedFrame':
+        """计算世界变换并生成本帧的绘制列表，不接触目标 Surface
+
+        可以在工作线程上与上一帧的 present_frame 重叠执行（见 pipeline.FramePipeline）；
+        命中检测与拾取数据在 present_frame 时才生效。两份 PreparedFrame 交替复用。
+        """
+        self.update_world_transform()
+
+        frame = self._frames[self._frame_index]
+        self._frame_index ^= 1
+        draw_list = frame.draw_list
+        draw_list.clear()
+        debug_points = frame.debug_points
+        debug_points.clear()
+        hit_items = frame.hit_items
+        hit_items.clear()
+
+        center_x = surface_size[0] // 2
+        center_y = surface_size[1] // 2
+        frame.center = (center_x, center_y)
         if not self.skin:
-            return
+            frame.empty = True
+            return frame
+        frame.empty = False
 
-        used_attachments = set()  # 防止重复贴图
+        profiling = PROFILER.enabled
+        if profiling:
+            start = perf_counter()
 
-        for bone in self.bones:
-            bone_name = bone.data.name
+        items = self.get_ordered_draw_items()
 
-            matched_attachment = None
-            for (slot_index, attachment_name), attachment in self.skin.attachments.items():
-                if attachment.type != AttachmentType.Region:
-                    continue
-                # 精确匹配
-                if attachment.name.startswith(bone_name) or attachment.path.startswith(bone_name):
+        if profiling:
+            now = perf_counter()
+            PROFILER.add("skeleton.match", now - start)
+            start = now
 
-                    if attachment.name in used_attachments:
-                        continue
-                    matched_attachment = attachment
-                    used_attachments.add(attachment.name)
-                    break
+        if self.animated_bone_names is None:
+            runs = [(None, items)]
+        else:
+            runs = self.static_layers.get_runs(self, tuple(surface_size), items)
 
-            if not matched_attachment:
-                continue
+        if profiling:
+            PROFILER.add("skeleton.static_layers", perf_counter() - start)
 
-            attachment = matched_attachment
-            region = attachment.region
-            if not region or not region.texture:
+        for layer, live_items in runs:
+            if layer is not None:
+                # 静态部件的预合成图层
+                draw_list.add(layer.surface, layer.position, None, pygame.BLEND_PREMULTIPLIED)
+                debug_points.extend(layer.debug_points)
+                hit_items.extend(layer.item_rects)
                 continue
 
-            texture = region.texture.copy()
+            tints = self.item_tints(live_items)
+            for (bone, attachment, slot_index), tint in zip(live_items, tints):
+                result = self.transform_attachment(bone, attachment, center_x, center_y,
+                                                   self.get_clip(slot_index), tint)
+                if result is None:
+                    continue
+                texture, px, py, key = result
 
-            # 贴图位置：骨骼位置 + 附件偏移
-            local_x = attachment.x
-            local_y = attachment.y
-            world_x = bone.world_x + local_x * bone.a + local_y * bone.b
-            world_y = bone.world_y + local_x * bone.c + local_y * bone.d
+                # 加入绘制列表，按插槽混合模式分组
+                blit_x = px - texture.get_width() // 2
+                blit_y = py - texture.get_height() // 2
+                blend_mode = self.data.slots[slot_index].blend_mode
+                draw_list.add(texture, (blit_x, blit_y), None, BLEND_FLAGS.get(blend_mode, 0))
 
-            px = center_x + (world_x + offset_x) * scale
-            py = center_y + (world_y + offset_y) * scale
+                debug_points.append((int(px), int(py)))
+                rect = pygame.Rect(int(blit_x), int(blit_y), texture.get_width(), texture.get_height())
+                hit_items.append((slot_index, attachment, rect, key, texture))
 
-            # 输出调试信息
-            if attachment.name not in used_attachments:
-                print(f"[Bone] name={bone_name}, world=({bone.world_x:.2f}, {bone.world_y:.2f})")
-                print(f"[Attachment] name={attachment.name}, region_center=({px:.2f}, {py:.2f}), bone={bone_name}")
-                used_attachments.add(attachment.name)
+        return frame
 
+    def present_frame(self, surface: pygame.Surface, frame: 'PreparedFrame'):
+        """把 prepare_frame 的结果提交到 surface，并发布命中检测与拾取数据"""
+        if frame.empty:
+            return
 
-            # 缩放
-            bone_scale_x = math.sqrt(bone.a ** 2 + bone.c ** 2)
-            bone_scale_y = math.sqrt(bone.b ** 2 + bone.d ** 2)
-            raw_scale_x = bone_scale_x * attachment.scaleX * scale
-            raw_scale_y = bone_scale_y * attachment.scaleY * scale
-            scale_x = abs(raw_scale_x)
-            scale_y = abs(raw_scale_y)
+        profiling = PROFILER.enabled
+        if profiling:
+            start = perf_counter()
 
-            if scale_x != 1 or scale_y != 1:
-                new_w = max(1, int(texture.get_width() * scale_x))
-                new_h = max(1, int(texture.get_height() * scale_y))
-                try:
-                    texture = pygame.transform.smoothscale(texture, (new_w, new_h))
-                except ValueError:
-                    continue
+        frame.draw_list.submit(surface)
 
-            if self.render_settings.flip_x or self.render_settings.flip_y:
-                texture = pygame.transform.flip(texture, self.render_settings.flip_x, self.render_settings.flip_y)
+        if profiling:
+            PROFILER.add("skeleton.blit", perf_counter() - start)
 
-            # 旋转贴图（骨骼旋转 + 附件角度）
-            rotation = -math.degrees(math.atan2(bone.c, bone.a)) + attachment.rotation
-            if rotation != 0:
-                texture = pygame.transform.rotate(texture, rotation)
+        hit_items = frame.hit_items
+        self._hit_items = hit_items
+        self._hit_center = frame.center
+        pick_index = self.pick_index
+        if pick_index is not None:
+            pick_index.begin_attachments(self)
+            for slot_index, attachment, rect, _, _ in hit_items:
+                pick_index.update_attachment(self, slot_index, attachment, rect)
+            pick_index.end_attachments(self)
+
+        # 整体 AABB，命中检测的第一级排除
+        self._hit_bounds = hit_items[0][2].unionall([item[2] for item in hit_items[1:]]) if hit_items else None
 
-            # 混合透明度（忽略颜色）
-            tint_a = self.a * attachment.color.a
-            if self.render_settings.use_premultiplied_alpha:
-                texture.set_alpha(int(tint_a * 255))
+        # 骨骼调试红点
+        if self.render_settings.debug_points:
+            for point in frame.debug_points:
+                pygame.draw.circle(surface, (255, 0, 0), point, 3)
+
+    def draw(self, surface: pygame.Surface):
+        self.present_frame(surface, self.prepare_frame(surface.get_size()))
 
-            # 绘制到 Pygame surface
-            blit_x = px - texture.get_width() // 2
-            blit_y = py - texture.get_height() // 2
-            surface.blit(texture, (blit_x, blit_y))
+    def hit_test(self, x: float, y: float):
+        """像素级命中检测，返回最上层命中的 (slot_index, attachment)，基于上一次 draw 的结果"""
+        bounds = self._hit_bounds
+        if bounds is None or not bounds.collidepoint(x, y):
+            return None
 
-            # 骨骼调试红点
-            pygame.draw.circle(surface, (255, 0, 0), (int(px), int(py)), 3)
+        for slot_index, attachment, rect, key, surface in reversed(self._hit_items):
+            if not rect.collidepoint(x, y):
+                continue
+            mask = self.surface_cache.get_mask(key, surface)
+            if mask.get_at((int(x) - rect.x, int(y) - rect.y)):
+                return slot_index, attachment
+        return None
+
+    def get_bounding_boxes(self):
+        """setup 附件为包围盒的插槽，骨骼变换变化时才重新计算多边形"""
+        if self._bounding_boxes is None:
+            self._bounding_boxes = []
+            if self.skin:
+                bone_map = {bone.data.name: bone for bone in self.all_bones}
+                for i, slot_data in enumerate(self.data.slots):
+                    if slot_data.attachment_name is None:
+                        continue
+                    attachment = self.skin.attachments.get((i, slot_data.attachment_name))
+                    if attachment is None or attachment.type != AttachmentType.BoundingBox:
+                        continue
+                    bone = bone_map.get(slot_data.bone_data.name)
+                    self._bounding_boxes.append(BoundingPolygon(attachment, bone, i, self.all_bones))
+        return self._bounding_boxes
+
+    def hit_test_bounding_boxes(self, x: float, y: float, surface_size=None) -> list:
+        """返回包含屏幕坐标 (x, y) 的包围盒附件列表（先用 AABB 排除）"""
+        if surface_size is None:
+            center_x, center_y = self._hit_center
+        else:
+            center_x = surface_size[0] // 2
+            center_y = surface_size[1] // 2
+        return [box.attachment for box in self.get_bounding_boxes()
+                if box.contains(x, y, center_x, center_y, self.render_settings)]
 
-    
     def draw_debug(self, surface: pygame.Surface):
         """绘制调试信息"""
         center_x = surface.get_width() // 2
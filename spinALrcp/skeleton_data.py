@@ -31,15 +31,88 @@ class MathUtils:
         return math.atan2(y, x)
 
 @dataclass
-class AnimationSlotTimeline:
+class AttachmentTimeline:
+    """插槽的附件时间轴：times 升序，names[i] 为 times[i] 起的附件名（None 表示清空）
+
+    附件引用按皮肤预先解析（resolve），播放时只做 bisect 和数组读取。
+    """
     slot_name: str
-    timelines: List[Dict]  
+    slot_index: int
+    times: List[float] = field(default_factory=list)
+    names: List[Optional[str]] = field(default_factory=list)
+    _resolved: Dict[int, tuple] = field(default_factory=dict, repr=False)
+
+    def resolve(self, skin: Optional['Skin']) -> list:
+        """与 times 对应的附件对象列表，按皮肤缓存"""
+        if skin is None:
+            return [None] * len(self.names)
+        cached = self._resolved.get(id(skin))
+        if cached is None or cached[0] is not skin:
+            attachments = [None if name is None else skin.attachments.get((self.slot_index, name))
+                           for name in self.names]
+            cached = self._resolved[id(skin)] = (skin, attachments)
+        return cached[1]
+
+@dataclass
+class AnimationBoneTimeline:
+    """骨骼时间轴，type 为 rotate/translate/scale/shear
+
+    frames: [{"time", "values": (angle,) 或 (x, y), "curve": None | "stepped" | (c1, c2, c3, c4)}]
+    """
+    bone_name: str
+    type: str
+    frames: List[Dict] = field(default_factory=list)
+
+@dataclass
+class EventData:
+    """JSON 顶层 events 中定义的事件及其缺省参数"""
+    name: str
+    int_value: int = 0
+    float_value: float = 0.0
+    string_value: str = ""
+    audio_path: Optional[str] = None
+    volume: float = 1.0
+    balance: float = 0.0
+
+@dataclass
+class Event:
+    """动画中的一个事件关键帧，参数已按关键帧覆盖缺省值"""
+    data: EventData
+    time: float
+    int_value: int = 0
+    float_value: float = 0.0
+    string_value: str = ""
+    volume: float = 1.0
+    balance: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.data.name
+
+@dataclass
+class EventTimeline:
+    """事件时间轴：times 升序，与 events 一一对应，用 bisect 查找区间内的事件"""
+    times: List[float] = field(default_factory=list)
+    events: List[Event] = field(default_factory=list)
+
+@dataclass
+class DrawOrderTimeline:
+    """绘制顺序时间轴：orders[i] 为 times[i] 起生效的完整插槽下标排列，None 表示 setup 顺序"""
+    times: List[float] = field(default_factory=list)
+    orders: List[Optional[Tuple[int, ...]]] = field(default_factory=list)
 
 @dataclass
 class Animation:
     name: str
     duration: float
-    slot_timelines: List[AnimationSlotTimeline] = field(default_factory=list)
+    slot_timelines: List[AttachmentTimeline] = field(default_factory=list)
+    bone_timelines: List[AnimationBoneTimeline] = field(default_factory=list)
+    event_timeline: Optional[EventTimeline] = None
+    draw_order_timeline: Optional[DrawOrderTimeline] = None
+    # colors.ColorTimelines：color / twoColor 时间轴打包后的数组
+    color_timelines: Optional[object] = field(default=None, repr=False)
+    # bounds.bake_bounds 预先计算的逐帧包围盒
+    bounds: Optional[object] = field(default=None, repr=False)
 
 @dataclass
 class BoneData:
@@ -171,6 +244,7 @@ class SlotData:
         self.bone_data = bone_data
         self.attachment_name = attachment_name
         self.color = Color(1, 1, 1, 1) 
+        self.dark_color: Optional[Color] = None  # 双色染色的暗部颜色（alpha 不用）
         self.blend_mode = "normal"   
 
 @dataclass
@@ -248,6 +322,62 @@ class MeshAttachment(Attachment):
     triangles: list = field(default_factory=list)
     region: Optional['TextureRegion'] = None
 
+@dataclass
+class VertexAttachment(Attachment):
+    """多边形顶点附件基类（裁剪、包围盒）"""
+    vertex_count: int = 0
+    vertices: list = field(default_factory=list)
+    bones: list = field(default_factory=list)  # 带权重时为 [骨骼数, 骨骼索引...]
+
+    def compute_world_vertices(self, bone, skeleton_bones=None) -> list:
+        """计算世界坐标下的多边形顶点 [x0, y0, x1, y1, ...]"""
+        world = []
+        if not self.bones:
+            x = bone.world_x
+            y = bone.world_y
+            a, b, c, d = bone.a, bone.b, bone.c, bone.d
+            vertices = self.vertices
+            for i in range(0, len(vertices), 2):
+                vx = vertices[i]
+                vy = vertices[i + 1]
+                world.append(vx * a + vy * b + x)
+                world.append(vx * c + vy * d + y)
+            return world
+
+        # 带权重顶点：累加每个影响骨骼的加权位置
+        bones = self.bones
+        vertices = self.vertices
+        b_index = 0
+        v_index = 0
+        while b_index < len(bones):
+            count = bones[b_index]
+            b_index += 1
+            wx = 0.0
+            wy = 0.0
+            for _ in range(count):
+                weight_bone = skeleton_bones[bones[b_index]]
+                vx = vertices[v_index]
+                vy = vertices[v_index + 1]
+                weight = vertices[v_index + 2]
+                wx += (vx * weight_bone.a + vy * weight_bone.b + weight_bone.world_x) * weight
+                wy += (vx * weight_bone.c + vy * weight_bone.d + weight_bone.world_y) * weight
+                b_index += 1
+                v_index += 3
+            world.append(wx)
+            world.append(wy)
+        return world
+
+@dataclass
+class ClippingAttachment(VertexAttachment):
+    """裁剪附件：裁剪从所在插槽之后直到 end 插槽的绘制"""
+    end_slot: Optional[str] = None
+    color: Color = field(default_factory=Color)
+
+@dataclass
+class BoundingBoxAttachment(VertexAttachment):
+    """包围盒附件：用于碰撞/命中检测的多边形"""
+    color: Color = field(default_factory=Color)
+
 @dataclass
 class Skin:
     """皮肤"""
@@ -263,6 +393,7 @@ class SkeletonData:
     skins: List[Skin] = field(default_factory=list)
     default_skin: Optional[Skin] = None
     animations: List[Animation] = field(default_factory=list)
+    events: Dict[str, EventData] = field(default_factory=dict)
     
     # 添加全局属性
     scale_x: float = 1
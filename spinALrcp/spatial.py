@@ -0,0 +1,155 @@
+import math
+from typing import Dict, Tuple
+
+
+class SpatialGrid:
+    """均匀网格索引：点和矩形按单元格登记，移动时只有跨单元格才重新登记"""
+    def __init__(self, cell_size: float = 64):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], dict] = {}
+        self.entries: Dict[object, list] = {}  # key -> [x0, y0, x1, y1, cell_range, payload]
+
+        self.moves = 0
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return (int(math.floor(x0 / size)), int(math.floor(y0 / size)),
+                int(math.floor(x1 / size)), int(math.floor(y1 / size)))
+
+    def _link(self, key, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    cell = self.cells[(cx, cy)] = {}
+                cell[key] = True
+
+    def _unlink(self, key, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    cell.pop(key, None)
+                    if not cell:
+                        del self.cells[(cx, cy)]
+
+    def update(self, key, x0, y0, x1, y1, payload=None):
+        """插入或移动一项（点传 x0 == x1, y0 == y1）"""
+        cell_range = self._cell_range(x0, y0, x1, y1)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [x0, y0, x1, y1, cell_range, payload]
+            self._link(key, cell_range)
+            return
+
+        if entry[4] != cell_range:
+            self._unlink(key, entry[4])
+            self._link(key, cell_range)
+            self.moves += 1
+        entry[0] = x0
+        entry[1] = y0
+        entry[2] = x1
+        entry[3] = y1
+        entry[4] = cell_range
+        entry[5] = payload
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._unlink(key, entry[4])
+
+    def query(self, x0, y0, x1, y1):
+        """返回与矩形相交的单元格中的候选 key"""
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return found
+
+
+class PickIndex:
+    """骨骼世界位置和附件屏幕矩形的拾取索引，可同时登记多个骨架"""
+    def __init__(self, viewport: Tuple[int, int], cell_size: float = 64):
+        self.viewport = viewport
+        self.bones = SpatialGrid(cell_size)
+        self.attachments = SpatialGrid(cell_size)
+
+        # 附件按帧刷新：记录每个骨架本帧登记过的 key
+        self._frame_keys: Dict[int, set] = {}
+        self._owned_keys: Dict[int, set] = {}
+        self._next_order = 0
+
+    def update_bones(self, skeleton):
+        """世界变换更新后调用，把骨骼转换到屏幕坐标并增量登记"""
+        settings = skeleton.render_settings
+        center_x = self.viewport[0] // 2
+        center_y = self.viewport[1] // 2
+        scale = settings.scale
+        offset_x = settings.position_x
+        offset_y = settings.position_y
+        grid = self.bones
+        for bone in skeleton.all_bones:
+            x = center_x + (bone.world_x + offset_x) * scale
+            y = center_y + (bone.world_y + offset_y) * scale
+            grid.update(id(bone), x, y, x, y, (skeleton, bone))
+
+    def remove_skeleton(self, skeleton):
+        for bone in skeleton.all_bones:
+            self.bones.remove(id(bone))
+        for key in self._owned_keys.pop(id(skeleton), set()):
+            self.attachments.remove(key)
+        self._frame_keys.pop(id(skeleton), None)
+
+    def begin_attachments(self, skeleton):
+        self._frame_keys[id(skeleton)] = set()
+
+    def update_attachment(self, skeleton, slot_index: int, attachment, rect):
+        """按绘制顺序登记附件本帧的屏幕矩形，后登记的在上层"""
+        key = (id(skeleton), slot_index, attachment.name)
+        order = self._next_order
+        self._next_order += 1
+        self.attachments.update(key, rect[0], rect[1], rect[0] + rect[2], rect[1] + rect[3],
+                                (skeleton, slot_index, attachment, order))
+        self._frame_keys[id(skeleton)].add(key)
+
+    def end_attachments(self, skeleton):
+        """移除本帧没有绘制的附件"""
+        seen = self._frame_keys.get(id(skeleton), set())
+        owned = self._owned_keys.get(id(skeleton), set())
+        for key in owned - seen:
+            self.attachments.remove(key)
+        self._owned_keys[id(skeleton)] = seen
+
+    def pick_bone(self, x: float, y: float, radius: float = 10):
+        """返回半径内最近的 (skeleton, bone)，没有则返回 None"""
+        grid = self.bones
+        best = None
+        best_dist = radius * radius
+        for key in grid.query(x - radius, y - radius, x + radius, y + radius):
+            entry = grid.entries[key]
+            dx = entry[0] - x
+            dy = entry[1] - y
+            dist = dx * dx + dy * dy
+            if dist <= best_dist:
+                best_dist = dist
+                best = entry[5]
+        return best
+
+    def pick_attachment(self, x: float, y: float):
+        """返回包含该点且绘制在最上层的 (skeleton, slot_index, attachment)"""
+        grid = self.attachments
+        best = None
+        best_order = None
+        for key in grid.query(x, y, x, y):
+            entry = grid.entries[key]
+            if entry[0] <= x < entry[2] and entry[1] <= y < entry[3]:
+                skeleton, slot_index, attachment, order = entry[5]
+                if best_order is None or order > best_order:
+                    best_order = order
+                    best = (skeleton, slot_index, attachment)
+        return best
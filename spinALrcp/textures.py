@@ -0,0 +1,281 @@
+"""pygame 渲染层的贴图加载：为纯数据的 Atlas 解码页面并切出区域 Surface
+
+页面像素与区域 Surface 存在进程级的 TEXTURE_CACHE 中，按 (真实路径, mtime) 共享，
+多个 Atlas 实例指向同一图集时只解码一次。
+"""
+import os
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+from atlas import Atlas, AtlasPage, TextureRegion, set_texture_loader
+
+
+# 解码/切分统计
+STATS = {
+    "pages_decoded": 0,
+    "regions_extracted": 0,
+    "rotated_copies": 0,
+}
+
+# 加载失败的页面路径 / 区域 (页面路径, 区域名)，避免每次访问都重试
+_failed_pages = set()
+_failed_regions = set()
+
+
+def decode_page(path: str) -> pygame.Surface:
+    """只解码 PNG，不做 convert_alpha，可以在后台线程调用"""
+    return pygame.image.load(path)
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+class PageEntry:
+    """缓存中的一个页面：像素、按 (rect, rotate) 共享的区域 Surface、引用计数"""
+    def __init__(self, surface: pygame.Surface):
+        self.surface = surface
+        self.regions = {}
+        self.refs = 0
+        self.bytes = surface_bytes(surface)
+
+    def add_region(self, key, surface: pygame.Surface):
+        self.regions[key] = surface
+        self.bytes += surface_bytes(surface)
+
+
+class TextureCache:
+    """进程级页面缓存
+
+    每个 Atlas 第一次用到某页时对该页加一次引用，Atlas 释放（或被回收）时减引用。
+    无人引用的页面保留在 LRU 中，总字节数超过 budget_bytes 时从最久未用的开始淘汰。
+    """
+    def __init__(self, budget_bytes: int = 64 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # (realpath, mtime_ns) -> PageEntry
+        self._owners = weakref.WeakKeyDictionary()  # Atlas -> set(keys)，当前持有引用的页面
+        self._used = weakref.WeakKeyDictionary()  # Atlas -> set(keys)，用过的全部页面
+
+        self.hits = 0
+        self.misses = 0
+        self.region_hits = 0
+        self.evictions = 0
+        self.reloads = 0
+        self._evicted = set()  # 被淘汰、仍可能被用过它的 Atlas 重新加载的页面
+
+    @staticmethod
+    def page_key(path: str):
+        real_path = os.path.realpath(path)
+        return real_path, os.stat(real_path).st_mtime_ns
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.bytes for entry in self.entries.values())
+
+    def _retain(self, owner, key, entry: PageEntry):
+        if owner is None:
+            return
+        keys = self._owners.get(owner)
+        if keys is None:
+            keys = self._owners[owner] = set()
+            used = self._used[owner] = set()
+            # Atlas 被回收时自动释放引用（回调不能持有 owner）
+            weakref.finalize(owner, self._release_owner, keys, used)
+        self._used[owner].add(key)
+        if key not in keys:
+            keys.add(key)
+            entry.refs += 1
+
+    def acquire_page(self, page: AtlasPage, decoded: pygame.Surface = None) -> pygame.Surface:
+        """decoded 为后台线程已解码的像素（见 decode_page），这里只做主线程上的转换"""
+        key = self.page_key(page.path)
+        entry = self.entries.get(key)
+        if entry is None:
+            texture = decoded if decoded is not None else decode_page(key[0])
+            # 没有显示设备（批处理/无头模式）时保留原始像素格式
+            if pygame.display.get_surface() is not None:
+                texture = texture.convert_alpha()
+            entry = self.entries[key] = PageEntry(texture)
+            self.misses += 1
+            if key in self._evicted:
+                # 被淘汰后再次使用
+                self._evicted.discard(key)
+                self.reloads += 1
+            STATS["pages_decoded"] += 1
+        else:
+            self.hits += 1
+        self.entries.move_to_end(key)
+        self._retain(page.atlas, key, entry)
+        self.trim()
+        return entry.surface
+
+    def get_region(self, page: AtlasPage, rect, rotate: bool) -> pygame.Surface:
+        """同一页面上相同矩形/旋转的区域在所有 Atlas 之间共享"""
+        key = self.page_key(page.path)
+        entry = self.entries.get(key)
+        if entry is None or entry.surface is not page.texture:
+            page.texture = self.acquire_page(page)
+            entry = self.entries[key]
+        region_key = (tuple(rect), rotate)
+        surface = entry.regions.get(region_key)
+        if surface is not None:
+            self.region_hits += 1
+            return surface
+
+        surface = entry.surface.subsurface(rect)
+        if rotate:
+            surface = pygame.transform.rotate(surface, -90)
+            STATS["rotated_copies"] += 1
+        STATS["regions_extracted"] += 1
+        entry.add_region(region_key, surface)
+        return surface
+
+    def _release_keys(self, keys):
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+        keys.clear()
+        self.trim()
+
+    def _release_owner(self, keys, used):
+        self._release_keys(keys)
+        # 没有其他 Atlas 用过的页面不会再被重新加载，不再记为已淘汰
+        released = set(used)
+        used.clear()
+        self._evicted.difference_update(
+            key for key in released if not any(key in other for other in self._used.values()))
+
+    def release(self, owner):
+        keys = self._owners.pop(owner, None)
+        used = self._used.pop(owner, None)
+        if keys is not None:
+            self._release_owner(keys, used)
+
+    def release_page(self, owner, key):
+        """只释放 owner 对某一页的引用（不触发淘汰）"""
+        keys = self._owners.get(owner)
+        if keys is None or key not in keys:
+            return
+        keys.discard(key)
+        entry = self.entries.get(key)
+        if entry is not None and entry.refs > 0:
+            entry.refs -= 1
+
+    def owners(self) -> list:
+        return list(self._owners.keys())
+
+    def trim(self, budget_bytes=None):
+        """超出预算时按 LRU 淘汰无人引用的页面"""
+        if budget_bytes is None:
+            budget_bytes = self.budget_bytes
+        total = self.total_bytes
+        if total <= budget_bytes:
+            return
+        for key in list(self.entries):
+            if total <= budget_bytes:
+                break
+            entry = self.entries[key]
+            if entry.refs > 0:
+                continue
+            total -= entry.bytes
+            del self.entries[key]
+            self._evicted.add(key)
+            self.evictions += 1
+
+    def evict(self, key) -> bool:
+        """淘汰指定页面（仍有引用时不淘汰）"""
+        entry = self.entries.get(key)
+        if entry is None or entry.refs > 0:
+            return False
+        del self.entries[key]
+        self._evicted.add(key)
+        self.evictions += 1
+        return True
+
+    def set_budget(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.trim()
+
+    def clear(self):
+        self.entries.clear()
+        self._evicted.clear()
+
+
+TEXTURE_CACHE = TextureCache()
+
+
+def load_page(page: AtlasPage, decoded: pygame.Surface = None) -> pygame.Surface:
+    """首次使用时从共享缓存取得页面像素，之后复用"""
+    if page.texture is None:
+        page.texture = TEXTURE_CACHE.acquire_page(page, decoded)
+        if not page.width or not page.height:
+            # 旧格式的 .atlas 没有 size 行，解码后补算 UV
+            page.width, page.height = page.texture.get_size()
+            if page.atlas is not None:
+                for region in page.atlas.regions.values():
+                    if region.page is page:
+                        Atlas.compute_uvs(region)
+    return page.texture
+
+
+def extract_region(region: TextureRegion) -> pygame.Surface:
+    """从页面切出区域，旋转区域转回原始朝向"""
+    load_page(region.page)
+    return TEXTURE_CACHE.get_region(region.page, region.sub_rect, region.rotate)
+
+
+def load_region(region: TextureRegion):
+    """按需切出单个区域并记在 region 上；只解码它所在的页面"""
+    page = region.page
+    if region.loaded_texture is not None or (page.path, region.name) in _failed_regions:
+        return
+    if page.path in _failed_pages:
+        return
+    try:
+        load_page(page)
+    except (pygame.error, FileNotFoundError):
+        _failed_pages.add(page.path)
+        print(f"无法加载纹理: {page.path}")
+        return
+    try:
+        region.texture = extract_region(region)
+    except ValueError:
+        _failed_regions.add((page.path, region.name))
+        print(f"无效的纹理区域: {region.name}")
+
+
+def load_atlas_textures(atlas: Atlas):
+    """一次性解码整个图集（预热或统计用）"""
+    for region in atlas.regions.values():
+        load_region(region)
+
+
+def release_page_textures(page: AtlasPage):
+    """丢弃单个页面及其区域的贴图，并释放图集对该页的引用"""
+    atlas = page.atlas
+    if atlas is not None:
+        for region in atlas.regions.values():
+            if region.page is page:
+                region.texture = None
+        try:
+            TEXTURE_CACHE.release_page(atlas, TextureCache.page_key(page.path))
+        except FileNotFoundError:
+            pass
+    page.texture = None
+
+
+def release_atlas_textures(atlas: Atlas):
+    """丢弃图集对页面和区域的引用，下次访问时重新从缓存获取"""
+    for region in atlas.regions.values():
+        region.texture = None
+    for page in atlas.pages:
+        page.texture = None
+    TEXTURE_CACHE.release(atlas)
+
+
+set_texture_loader(load_region)